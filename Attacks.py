@@ -8,141 +8,172 @@ import numpy as np
 from BitboardHelpers import *
 
 
-from Constants import HOT, Square, File, Rank, Piece, DARK_SQUARES, LIGHT_SQUARES, BOARD_SIZE, BOARD_SQUARES
+from Constants import File, BOARD_SIZE, BOARD_SQUARES
+
+## Complements of the edge files, shifts towards the east are masked with the
+## A File ones and shifts towards the west with the H File ones to remove the
+## squares that wrapped around the board. They are computed once here instead
+## of on every call of the generators
+NOT_A_FILE = ~File.hexA & MASK64
+NOT_H_FILE = ~File.hexH & MASK64
+NOT_AB_FILES = ~(File.hexA | File.hexB) & MASK64
+NOT_GH_FILES = ~(File.hexG | File.hexH) & MASK64
+
+## ---------------------------------------- ##
+## Kogge-Stone fills                        ##
+## ---------------------------------------- ##
+
+def fill_up(generator: int, propagator: int, shift: int) -> int:
+    """
+    Parallel prefix (Kogge-Stone) fill of the generator bits towards the
+    higher squares of the board, every step doubles the distance covered so
+    a full ray across the board takes three shift-OR pairs
+    Parameters:
+        generator: bitboard of the squares from which to start filling
+        propagator: bitboard of the squares the fill is allowed to enter,
+        the file masks in here prevent wrapping around the board edges
+        shift: distance between two consecutive squares in the direction
+    Return:
+        bitboard of the generator squares and all squares filled from them
+    """
+    ## Rebind rather than update in place, the generator may be a numpy array
+    ## shared with the caller when all squares are filled at once
+    generator = generator | propagator & (generator << shift)
+    propagator = propagator & propagator << shift
+    generator = generator | propagator & (generator << 2 * shift)
+    propagator = propagator & propagator << 2 * shift
+    generator = generator | propagator & (generator << 4 * shift)
+    return generator & MASK64
+
+def fill_down(generator: int, propagator: int, shift: int) -> int:
+    """
+    Parallel prefix (Kogge-Stone) fill of the generator bits towards the
+    lower squares of the board, the mirror image of fill_up
+    Parameters:
+        generator: bitboard of the squares from which to start filling
+        propagator: bitboard of the squares the fill is allowed to enter,
+        the file masks in here prevent wrapping around the board edges
+        shift: distance between two consecutive squares in the direction
+    Return:
+        bitboard of the generator squares and all squares filled from them
+    """
+    ## Rebind rather than update in place, see fill_up
+    generator = generator | propagator & (generator >> shift)
+    propagator = propagator & propagator >> shift
+    generator = generator | propagator & (generator >> 2 * shift)
+    propagator = propagator & propagator >> 2 * shift
+    generator = generator | propagator & (generator >> 4 * shift)
+    return generator & MASK64
 
 ## ---------------------------------------- ##
 ## Horizontal, Vertical, and Diagonal rays  ##
 ## ---------------------------------------- ##
 
-def south_ray(bitboard: np.uint64, from_square: int) -> np.uint64:
+def south_ray(from_square: int) -> int:
     """
     Generate static bitboard of south sliding piece attacked squares
     on an otherwise empty board
     Parameters:
-        bitboard: the bitboard representing the south ray sliding attacks
         from_square: square index of the piece from which to generate
         the south sliding ray
     Return:
         bitboard of all southern squares attacked on an empty bitboard
     """
-    original_square = from_square
-    bitboard = set_bit_multi(bitboard, from_square + np.array(range(0, -64, -8)))
-    bitboard = clear_bit(bitboard, original_square)
-    return bitboard
+    square = 1 << from_square
+    return fill_down(square, MASK64, 8) ^ square
 
-def north_ray(bitboard: np.uint64, from_square: int) -> np.uint64:
+def north_ray(from_square: int) -> int:
     """
     Generate static bitboard of north sliding piece attacked squares
     on an otherwise empty board
     Parameters:
-        bitboard: the bitboard representing the north ray sliding attacks
         from_square: square index of the piece from which to generate
         the north sliding ray
     Return:
         bitboard of all northern squares attacked on an empty bitboard
     """
-    original_square = from_square
-    bitboard = set_bit_multi(bitboard, from_square + np.array(range(0, 64, 8)))
-    bitboard = clear_bit(bitboard, original_square)
-    return bitboard
+    square = 1 << from_square
+    return fill_up(square, MASK64, 8) ^ square
 
-def west_ray(bitboard: np.uint64, from_square: int) -> np.uint64:
+def west_ray(from_square: int) -> int:
     """
     Generate static bitboard of west sliding piece attacked squares
     on an otherwise empty board
     Parameters:
-        bitboard: the bitboard representing the west ray sliding attacks
         from_square: square index of the piece from which to generate
         the west sliding ray
     Return:
         bitboard of all western squares attacked on an empty bitboard
     """
-    original_square = from_square
-    bitboard = set_bit_multi(bitboard, from_square + np.array(range(0, - (from_square % 8) - 1, -1)))
-    bitboard = clear_bit(bitboard, original_square)
-    return bitboard
+    square = 1 << from_square
+    return fill_down(square, NOT_H_FILE, 1) ^ square
 
-def east_ray(bitboard: np.uint64, from_square: int) -> np.uint64:
+def east_ray(from_square: int) -> int:
     """
     Generate static bitboard of east sliding piece attacked squares
     on an otherwise empty board
     Parameters:
-        bitboard: the bitboard representing the east ray sliding attacks
         from_square: square index of the piece from which to generate
         the east sliding ray
     Return:
         bitboard of all eastern squares attacked on an empty bitboard
     """
-    original_square = from_square
-    bitboard = set_bit_multi(bitboard, from_square + np.array(range(0, 8 - from_square % 8, 1)))
-    bitboard = clear_bit(bitboard, original_square)
-    return bitboard
+    square = 1 << from_square
+    return fill_up(square, NOT_A_FILE, 1) ^ square
 
-def southeast_ray(bitboard: np.uint64, from_square: int) -> np.uint64:
+def southeast_ray(from_square: int) -> int:
     """
     Generate static bitboard of southeast sliding piece attacked squares
     on an otherwise empty board
     Parameters:
-        bitboard: the bitboard representing the southeast ray sliding attacks
         from_square: square index of the piece from which to generate
         the southeast sliding ray
     Return:
         bitboard of all southeastern squares attacked on an empty bitboard
     """
-    original_square = from_square
-    bitboard = set_bit_multi(bitboard, np.array(range(from_square, 0, -7)))
-    bitboard = clear_bit(bitboard, original_square)
-    return bitboard
+    square = 1 << from_square
+    return fill_down(square, NOT_A_FILE, 7) ^ square
 
-def southwest_ray(bitboard: np.uint64, from_square: int) -> np.uint64:
+def southwest_ray(from_square: int) -> int:
     """
     Generate static bitboard of southwest sliding piece attacked squares
     on an otherwise empty board
     Parameters:
-        bitboard: the bitboard representing the southwest ray sliding attacks
         from_square: square index of the piece from which to generate
         the southwest sliding ray
     Return:
         bitboard of all southwestern squares attacked on an empty bitboard
     """
-    original_square = from_square
-    bitboard = set_bit_multi(bitboard, np.array(range(from_square, 0, -9)))
-    bitboard = clear_bit(bitboard, original_square)
-    return bitboard
+    square = 1 << from_square
+    return fill_down(square, NOT_H_FILE, 9) ^ square
 
-def northwest_ray(bitboard: np.uint64, from_square: int) -> np.uint64:
+def northwest_ray(from_square: int) -> int:
     """
     Generate static bitboard of northwest sliding piece attacked squares
     on an otherwise empty board
     Parameters:
-        bitboard: the bitboard representing the northwest ray sliding attacks
         from_square: square index of the piece from which to generate
         the northwest sliding ray
     Return:
         bitboard of all northwestern squares attacked on an empty bitboard
     """
-    original_square = from_square
-    bitboard = set_bit_multi(bitboard, np.array(range(from_square, 63, 7)))
-    bitboard = clear_bit(bitboard, original_square)
-    return bitboard
+    square = 1 << from_square
+    return fill_up(square, NOT_H_FILE, 7) ^ square
 
-def northeast_ray(bitboard: np.uint64, from_square: int) -> np.uint64:
+def northeast_ray(from_square: int) -> int:
     """
     Generate static bitboard of northeast sliding piece attacked squares
     on an otherwise empty board
     Parameters:
-        bitboard: the bitboard representing the northeast ray sliding attacks
         from_square: square index of the piece from which to generate
         the northeast sliding ray
     Return:
         bitboard of all northeastern squares attacked on an empty bitboard
     """
-    original_square = from_square
-    bitboard = set_bit_multi(bitboard, np.array(range(from_square, 64, 9)))
-    bitboard = clear_bit(bitboard, original_square)
-    return bitboard
+    square = 1 << from_square
+    return fill_up(square, NOT_A_FILE, 9) ^ square
 
-def file_attack(from_square: int) -> np.uint64:
+def file_attack(from_square: int) -> int:
     """
     Generate static bitboard of north-south sliding piece attacked squares
     on an otherwise empty board
@@ -152,12 +183,11 @@ def file_attack(from_square: int) -> np.uint64:
     Return:
         bitboard of all squares in a file attacked on an empty bitboard
     """
-    bitboard = make_uint()
-    attack_board = (north_ray(bitboard, from_square) |
-                    south_ray(bitboard, from_square))
-    return clear_bit(attack_board, from_square)
+    ## The rays already leave out the square of the piece itself
+    return (north_ray(from_square) |
+            south_ray(from_square))
 
-def rank_attack(from_square: int) -> np.uint64:
+def rank_attack(from_square: int) -> int:
     """
     Generate static bitboard of east-west sliding piece attacked squares
     on an otherwise empty board
@@ -167,12 +197,10 @@ def rank_attack(from_square: int) -> np.uint64:
     Return:
         bitboard of all squares in a rank attacked on an empty bitboard
     """
-    bitboard = make_uint()
-    attack_board = (east_ray(bitboard, from_square) |
-                    west_ray(bitboard, from_square))
-    return clear_bit(attack_board, from_square)
+    return (east_ray(from_square) |
+            west_ray(from_square))
 
-def diagonal_attack(from_square: int) -> np.uint64:
+def diagonal_attack(from_square: int) -> int:
     """
     Generate static bitboard of diagonal sliding piece attacked squares
     on an otherwise empty board
@@ -183,18 +211,120 @@ def diagonal_attack(from_square: int) -> np.uint64:
         bitboard of all squares attacked by a diagonally moving piece
         on an empty bitboard
     """
-    bitboard = make_uint()
-    attack_board = (northeast_ray(bitboard, from_square) |
-                    northwest_ray(bitboard, from_square) |
-                    southeast_ray(bitboard, from_square) |
-                    southwest_ray(bitboard, from_square))
-    return clear_bit(attack_board, from_square)
+    return (northeast_ray(from_square) |
+            northwest_ray(from_square) |
+            southeast_ray(from_square) |
+            southwest_ray(from_square))
+
+def main_diagonal_attack(from_square: int) -> int:
+    """
+    Generate static bitboard of squares attacked along the southwest-northeast
+    diagonal through the given square on an otherwise empty board
+    Parameters:
+        from_square: square index of the piece from which to generate
+        the diagonal sliding ray
+    Return:
+        bitboard of all squares attacked along the diagonal on an empty bitboard
+    """
+    return (northeast_ray(from_square) |
+            southwest_ray(from_square))
+
+def anti_diagonal_attack(from_square: int) -> int:
+    """
+    Generate static bitboard of squares attacked along the southeast-northwest
+    anti-diagonal through the given square on an otherwise empty board
+    Parameters:
+        from_square: square index of the piece from which to generate
+        the anti-diagonal sliding ray
+    Return:
+        bitboard of all squares attacked along the anti-diagonal on an
+        empty bitboard
+    """
+    return (northwest_ray(from_square) |
+            southeast_ray(from_square))
+
+## ---------------------------------------- ##
+## Hyperbola Quintessence sliding attacks   ##
+## ---------------------------------------- ##
+
+def byteswap(bitboard: int) -> int:
+    """
+    Mirror a bitboard vertically by reversing the order of its ranks, for
+    a line with at most one square per rank this equals a bit reversal
+    Parameters:
+        bitboard: the bitboard to mirror
+    Return:
+        bitboard with rank 1 and rank 8, rank 2 and rank 7, etc. swapped
+    """
+    return int.from_bytes(bitboard.to_bytes(8, 'little'), 'big')
+
+def hyperbola_quintessence(occupied: int, mask: int, from_square: int) -> int:
+    """
+    Generate the squares attacked by a sliding piece along a single file or
+    (anti-)diagonal given the occupancy of the board. Subtracting the slider
+    from the blockers above it sets all squares up to and including the first
+    blocker, doing the same on the mirrored board gives the squares below it
+    Parameters:
+        occupied: bitboard of all occupied squares on the board
+        mask: bitboard of the line through the slider excluding its own square
+        from_square: square index of the sliding piece
+    Return:
+        bitboard of the attacked squares along the line, up to and including
+        the first blocker in both directions
+    """
+    slider = 1 << from_square
+    forward = occupied & mask
+    ## Mirroring the ranks of a single square only flips its rank bits, which
+    ## saves a byteswap of the slider
+    reverse = (byteswap(forward) - (1 << (from_square ^ 56))) & MASK64
+    forward = (forward - slider) & MASK64
+    return (forward ^ byteswap(reverse)) & mask
+
+def hyperbola_rank_attack(occupied: int, from_square: int) -> int:
+    """
+    Generate the squares attacked by a sliding piece along its rank given the
+    occupancy of the board, ranks can not be mirrored by a byteswap so the
+    attacks are looked up in the first rank table instead
+    Parameters:
+        occupied: bitboard of all occupied squares on the board
+        from_square: square index of the sliding piece
+    Return:
+        bitboard of the attacked squares along the rank, up to and including
+        the first blocker in both directions
+    """
+    rank_shift = from_square & 56
+    ## Only the six inner squares of a rank can block, the edge squares are
+    ## attacked or not regardless of what stands on them
+    inner_occupancy = (occupied >> (rank_shift + 1)) & 63
+    return FIRST_RANK_ATTACKS[(from_square & 7) << 6 | inner_occupancy] << rank_shift
+
+def first_rank_attack(file: int, inner_occupancy: int) -> int:
+    """
+    Generate the squares attacked along the first rank by a sliding piece
+    on the given file for the given occupancy of the rank
+    Parameters:
+        file: file index of the sliding piece, 0 for the A file
+        inner_occupancy: occupancy of the squares B1 through G1 shifted
+        down by a single square
+    Return:
+        bitboard of the attacked squares on the first rank
+    """
+    occupied = inner_occupancy << 1
+    attacks = 0
+    for step in [-1, 1]:
+        target = file + step
+        while 0 <= target < BOARD_SIZE:
+            attacks |= 1 << target
+            if occupied & (1 << target):
+                break
+            target += step
+    return attacks
 
 ## ------------------------ ##
 ## Knight attack pattern    ##
 ## ------------------------ ##
 
-def generate_knight_attack_bitboard(from_square: int) -> np.uint64:
+def generate_knight_attack_bitboard(from_square: int) -> int:
     """
     Generate a static bitboard of squares attacked by a knight
     Parameters:
@@ -203,67 +333,100 @@ def generate_knight_attack_bitboard(from_square: int) -> np.uint64:
     Return:
         bitboard of all attacked squares by a knight
     """
-    bitboard = make_uint()
-    for i in [6, 10, 15, 17, -6, -10, -15, -17]:
-        bitboard |= set_bit(bitboard, from_square + i)
-        ## Mask for wrapping around when near edges of the board
-        if from_square in (File.B | File.A):
-            bitboard &= ~(np.uint64(File.hexG | File.hexH))
-        if from_square in (File.G | File.H):
-            bitboard &= ~(np.uint64(File.hexA | File.hexB))
+    return knight_set_attacks(1 << from_square)
 
-    return bitboard
+def knight_set_attacks(knights: int) -> int:
+    """
+    Generate a bitboard of squares attacked by a set of knights
+    Parameters:
+        knights: bitboard of the knights
+    Return:
+        bitboard of all attacked squares by the knights
+    """
+    ## Jumps that move one or two files east can not end up in the A or A/B
+    ## files and vice versa for jumps moving west, masking those files removes
+    ## the squares that wrapped around the edge of the board
+    return ((knights << 17) & NOT_A_FILE | (knights << 15) & NOT_H_FILE |
+            (knights << 10) & NOT_AB_FILES | (knights << 6) & NOT_GH_FILES |
+            (knights >> 6) & NOT_AB_FILES | (knights >> 10) & NOT_GH_FILES |
+            (knights >> 15) & NOT_A_FILE | (knights >> 17) & NOT_H_FILE) & MASK64
 
 ## ------------------------ ##
 ## Rook attack pattern      ##
 ## ------------------------ ##
 
-def generate_rook_attack_bitboard(from_square: int) -> np.uint64:
+def generate_rook_attack_bitboard(from_square: int, occupied: int = 0) -> int:
     """
-    Generate a static bitboard of squares attacked by a rook
+    Generate a bitboard of squares attacked by a rook
     Parameters:
         from_square: square from which the rook is attacking to generate
         a bitboard
+        occupied: bitboard of all occupied squares blocking the rook
     Return:
-        bitboard of all attacked squares by a rook
+        bitboard of all attacked squares by a rook, up to and including
+        the first blocker in every direction
     """
-    return file_attack(from_square) | rank_attack(from_square)
+    return (hyperbola_quintessence(occupied, FILE_ATTACKS[from_square], from_square) |
+            hyperbola_rank_attack(occupied, from_square))
 
 ## ------------------------ ##
 ## Bishop attack pattern    ##
 ## ------------------------ ##
 
-def generate_bishop_attack_bitboard(from_square: int) -> np.uint64:
+def generate_bishop_attack_bitboard(from_square: int, occupied: int = 0) -> int:
     """
-    Generate a static bitboard of squares attacked by a bishop
+    Generate a bitboard of squares attacked by a bishop
     Parameters:
         from_square: square from which the bishop is attacking to generate
         a bitboard
+        occupied: bitboard of all occupied squares blocking the bishop
     Return:
-        bitboard of all attacked squares by a bishop
-    """
-    return diagonal_attack(from_square)
+        bitboard of all attacked squares by a bishop, up to and including
+        the first blocker in every direction
+    """
+    ## Both diagonals are fused into one Hyperbola Quintessence pass, the two
+    ## lines do not overlap so their halves can be combined before mirroring
+    ## back, which needs two byteswaps instead of four. Mirroring the ranks
+    ## turns the diagonal of a square into the anti-diagonal of the mirrored
+    ## square, so the mirrored masks are looked up instead of byteswapped
+    main_diagonal = MAIN_DIAGONAL_ATTACKS[from_square]
+    anti_diagonal = ANTI_DIAGONAL_ATTACKS[from_square]
+    slider = 1 << from_square
+    forward = (((occupied & main_diagonal) - slider) & main_diagonal |
+               ((occupied & anti_diagonal) - slider) & anti_diagonal)
+
+    mirrored_square = from_square ^ 56
+    mirrored_main_diagonal = ANTI_DIAGONAL_ATTACKS[mirrored_square]
+    mirrored_anti_diagonal = MAIN_DIAGONAL_ATTACKS[mirrored_square]
+    mirrored_occupied = byteswap(occupied)
+    mirrored_slider = 1 << mirrored_square
+    reverse = (((mirrored_occupied & mirrored_main_diagonal) - mirrored_slider) & mirrored_main_diagonal |
+               ((mirrored_occupied & mirrored_anti_diagonal) - mirrored_slider) & mirrored_anti_diagonal)
+    return forward ^ byteswap(reverse)
 
 ## ------------------------ ##
 ## Queen attack pattern     ##
 ## ------------------------ ##
 
-def generate_queen_attack_bitboard(from_square: int) -> np.uint64:
+def generate_queen_attack_bitboard(from_square: int, occupied: int = 0) -> int:
     """
-    Generate a static bitboard of squares attacked by a queen
+    Generate a bitboard of squares attacked by a queen
     Parameters:
         from_square: square from which the queen is attacking to generate
         a bitboard
+        occupied: bitboard of all occupied squares blocking the queen
     Return:
-        bitboard of all attacked squares by a queen
+        bitboard of all attacked squares by a queen, up to and including
+        the first blocker in every direction
     """
-    return diagonal_attack(from_square) | file_attack(from_square) | rank_attack(from_square)
+    return (generate_rook_attack_bitboard(from_square, occupied) |
+            generate_bishop_attack_bitboard(from_square, occupied))
 
 ## ------------------------ ##
 ## King attack pattern      ##
 ## ------------------------ ##
 
-def generate_king_attack_bitboard(from_square: int) -> np.uint64:
+def generate_king_attack_bitboard(from_square: int) -> int:
     """
     Generate a static bitboard of squares attacked by a king
     Parameters:
@@ -272,26 +435,84 @@ def generate_king_attack_bitboard(from_square: int) -> np.uint64:
     Return:
         bitboard of all attacked squares by a king
     """
-    bitboard = make_uint()
-    ## North/South attacks do not need a guard cause these indices simply do not
-    ## exist if they are needed
-    for i in [-8, 8]:
-        bitboard |= HOT << np.uint(from_square + i)
-    ## East direction attacks, need to guard we are not in File H because you can
-    ## not attack in File A in this case
-    for i in [-7, 1, 9]:
-        bitboard |= HOT << np.uint(from_square + i) & ~np.uint64(File.hexA)
-    ## West direction attacks, need to guard we are not in File A because you can
-    ## not attack in File H in this case
-    for i in [-9, -1, 7]:
-        bitboard |= HOT << np.uint(from_square + i) & ~np.uint64(File.hexH)
-    return bitboard
+    return king_set_attacks(1 << from_square)
+
+def king_set_attacks(kings: int) -> int:
+    """
+    Generate a bitboard of squares attacked by a set of kings
+    Parameters:
+        kings: bitboard of the kings
+    Return:
+        bitboard of all attacked squares by the kings
+    """
+    ## Steps towards the east can not land on the A File and steps towards the
+    ## west can not land on the H File without having wrapped around the board
+    east = (kings << 1) & NOT_A_FILE
+    west = (kings >> 1) & NOT_H_FILE
+    ## Shifting the kings and their neighbours on the rank up and down a rank
+    ## covers the remaining squares, steps off the board are masked off
+    rank = kings | east | west
+    return ((rank << 8) | (rank >> 8) | east | west) & MASK64
 
 ## ---------------------------- ##
 ## Pawn attack/move patterns    ##
 ## ---------------------------- ##
 
-def generate_white_pawn_attack_bitboard(from_square: int) -> np.uint64:
+def white_pawn_set_attacks(pawns: int) -> int:
+    """
+    Generate a bitboard of squares attacked by a set of white pawns
+    Parameters:
+        pawns: bitboard of the white pawns
+    Return:
+        bitboard of all attacked squares by the white pawns
+    """
+    ## Northeast captures can not land on the A File and northwest captures
+    ## can not land on the H File, those squares wrapped around the board
+    return ((pawns << 9) & NOT_A_FILE |
+            (pawns << 7) & NOT_H_FILE) & MASK64
+
+def black_pawn_set_attacks(pawns: int) -> int:
+    """
+    Generate a bitboard of squares attacked by a set of black pawns
+    Parameters:
+        pawns: bitboard of the black pawns
+    Return:
+        bitboard of all attacked squares by the black pawns
+    """
+    ## Southeast captures can not land on the A File and southwest captures
+    ## can not land on the H File, those squares wrapped around the board
+    return ((pawns >> 7) & NOT_A_FILE |
+            (pawns >> 9) & NOT_H_FILE)
+
+def white_pawn_set_pushes(pawns: int, empty: int) -> int:
+    """
+    Generate a bitboard of squares a set of white pawns can push to
+    Parameters:
+        pawns: bitboard of the white pawns
+        empty: bitboard of the empty squares
+    Return:
+        bitboard of all single and double push targets of the white pawns
+    """
+    ## The double push only continues from a single push onto the third rank
+    ## so a blocked pawn can not jump over the blocker
+    single_pushes = (pawns << 8) & empty
+    return single_pushes | ((single_pushes & RANK_3) << 8) & empty
+
+def black_pawn_set_pushes(pawns: int, empty: int) -> int:
+    """
+    Generate a bitboard of squares a set of black pawns can push to
+    Parameters:
+        pawns: bitboard of the black pawns
+        empty: bitboard of the empty squares
+    Return:
+        bitboard of all single and double push targets of the black pawns
+    """
+    ## The double push only continues from a single push onto the sixth rank
+    ## so a blocked pawn can not jump over the blocker
+    single_pushes = (pawns >> 8) & empty
+    return single_pushes | ((single_pushes & RANK_6) >> 8) & empty
+
+def generate_white_pawn_attack_bitboard(from_square: int) -> int:
     """
     Generate a static bitboard of squares attacked by a white pawn
     Parameters:
@@ -300,14 +521,9 @@ def generate_white_pawn_attack_bitboard(from_square: int) -> np.uint64:
     Return:
         bitboard of all attacked squares by a white pawn
     """
-    bitboard = make_uint()
-    ## Northeast direction, mask A File cause we cannot attack that
-    bitboard |= HOT << np.uint64(from_square + 9) & ~np.uint64(File.hexA)
-    ## Northwest direction, mask H File cause we cannot attack that
-    bitboard |= HOT << np.uint64(from_square + 7) & ~np.uint64(File.hexH)
-    return bitboard
+    return white_pawn_set_attacks(1 << from_square)
 
-def generate_black_pawn_attack_bitboard(from_square: int) -> np.uint64:
+def generate_black_pawn_attack_bitboard(from_square: int) -> int:
     """
     Generate a static bitboard of squares attacked by a black pawn
     Parameters:
@@ -316,14 +532,9 @@ def generate_black_pawn_attack_bitboard(from_square: int) -> np.uint64:
     Return:
         bitboard of all attacked squares by a black pawn
     """
-    bitboard = make_uint()
-    ## Southeast direction, mask A File cause we cannot attack that
-    bitboard |= HOT << np.uint64(from_square - 9) & ~np.uint64(File.hexA)
-    ## Southwest direction, mask H File cause we cannot attack that
-    bitboard |= HOT << np.uint64(from_square - 7) & ~np.uint64(File.hexH)
-    return bitboard
+    return black_pawn_set_attacks(1 << from_square)
 
-def generate_white_pawn_move_bitboard(from_square: int) -> np.uint64:
+def generate_white_pawn_move_bitboard(from_square: int) -> int:
     """
     Generate a static bitboard of squares to which a white pawn can move
     Parameters:
@@ -331,13 +542,11 @@ def generate_white_pawn_move_bitboard(from_square: int) -> np.uint64:
     Return:
         bitboard of all squares a white pawn can move to
     """
-    bitboard = make_uint()
-    bitboard |= HOT << np.uint64(from_square + 8)
-    if from_square in Rank.x2:
-        bitboard |= HOT << np.uint64(from_square + 16)
-    return bitboard
+    pawn = 1 << from_square
+    ## Only pawns on their starting rank can make the double push
+    return ((pawn << 8) | ((pawn & RANK_2) << 16)) & MASK64
 
-def generate_black_pawn_move_bitboard(from_square: int) -> np.uint64:
+def generate_black_pawn_move_bitboard(from_square: int) -> int:
     """
     Generate a static bitboard of squares to which a black pawn can move
     Parameters:
@@ -345,11 +554,303 @@ def generate_black_pawn_move_bitboard(from_square: int) -> np.uint64:
     Return:
         bitboard of all squares a black pawn can move to
     """
-    bitboard = make_uint()
-    bitboard |= HOT << np.uint64(from_square - 8)
-    if from_square in Rank.x7:
-        bitboard |= HOT << np.uint64(from_square - 16)
-    return bitboard
+    pawn = 1 << from_square
+    ## Only pawns on their starting rank can make the double push, a pawn on
+    ## the first rank is shifted off the board
+    return (pawn >> 8) | ((pawn & RANK_7) >> 16)
+
+## ---------------------------------------------------- ##
+## Precomputed attack tables for every square           ##
+## ---------------------------------------------------- ##
+
+## Every square of the board at once, the branchless generators only use
+## shifts and masks so they can be evaluated on this whole vector in a
+## single pass of numpy ufuncs instead of a Python loop over the squares
+SQUARES = np.arange(BOARD_SQUARES, dtype=np.uint64)
+
+def build_attack_tables() -> dict:
+    """
+    Build the static attack tables of all pieces for every square in a
+    single pass. The file, rank and diagonal attacks are generated once and
+    combined into the rook, bishop and queen tables instead of generating
+    the rays again for every sliding piece
+    Returns:
+        dictionary of tuples of attack bitboards indexed by square
+    """
+    ## Every generator is branchless and evaluates all squares at once
+    file_attacks = file_attack(SQUARES)
+    rank_attacks = rank_attack(SQUARES)
+    main_diagonal_attacks = main_diagonal_attack(SQUARES)
+    anti_diagonal_attacks = anti_diagonal_attack(SQUARES)
+    diagonal_attacks = main_diagonal_attacks | anti_diagonal_attacks
+    rook_attacks = file_attacks | rank_attacks
+    tables = {
+        "rank_attacks": rank_attacks,
+        "file_attacks": file_attacks,
+        "diagonal_attacks": diagonal_attacks,
+        "main_diagonal_attacks": main_diagonal_attacks,
+        "anti_diagonal_attacks": anti_diagonal_attacks,
+        "knight_attacks": generate_knight_attack_bitboard(SQUARES),
+        "king_attacks": generate_king_attack_bitboard(SQUARES),
+        "white_pawn_attacks": generate_white_pawn_attack_bitboard(SQUARES),
+        "black_pawn_attacks": generate_black_pawn_attack_bitboard(SQUARES),
+        "white_pawn_moves": generate_white_pawn_move_bitboard(SQUARES),
+        "black_pawn_moves": generate_black_pawn_move_bitboard(SQUARES),
+        "rook_attacks": rook_attacks,
+        "bishop_attacks": diagonal_attacks,
+        "queen_attacks": rook_attacks | diagonal_attacks,
+    }
+    tables = {name: tuple(table.tolist()) for name, table in tables.items()}
+
+    ## Rank attacks of a slider on every file for every occupancy of the six
+    ## inner squares, indexed by file * 64 + occupancy
+    tables["first_rank_attacks"] = tuple(first_rank_attack(file, occupancy)
+                                         for file in range(BOARD_SIZE) for occupancy in range(64))
+    return tables
+
+ATTACK_TABLES = build_attack_tables()
+RANK_ATTACKS = ATTACK_TABLES["rank_attacks"]
+FILE_ATTACKS = ATTACK_TABLES["file_attacks"]
+DIAGONAL_ATTACKS = ATTACK_TABLES["diagonal_attacks"]
+MAIN_DIAGONAL_ATTACKS = ATTACK_TABLES["main_diagonal_attacks"]
+ANTI_DIAGONAL_ATTACKS = ATTACK_TABLES["anti_diagonal_attacks"]
+KNIGHT_ATTACKS = ATTACK_TABLES["knight_attacks"]
+ROOK_ATTACKS = ATTACK_TABLES["rook_attacks"]
+BISHOP_ATTACKS = ATTACK_TABLES["bishop_attacks"]
+QUEEN_ATTACKS = ATTACK_TABLES["queen_attacks"]
+KING_ATTACKS = ATTACK_TABLES["king_attacks"]
+WHITE_PAWN_ATTACKS = ATTACK_TABLES["white_pawn_attacks"]
+BLACK_PAWN_ATTACKS = ATTACK_TABLES["black_pawn_attacks"]
+WHITE_PAWN_MOVES = ATTACK_TABLES["white_pawn_moves"]
+BLACK_PAWN_MOVES = ATTACK_TABLES["black_pawn_moves"]
+FIRST_RANK_ATTACKS = ATTACK_TABLES["first_rank_attacks"]
+
+## ---------------------------------------------------- ##
+## Magic bitboard sliding attacks                       ##
+## ---------------------------------------------------- ##
+
+## Magic multipliers that map every relevant occupancy of a square onto a
+## unique index (or an index sharing the same attacks) of its attack table,
+## found once offline by a random search with the shift fixed at 64 minus
+## the number of relevant occupancy bits of the square
+ROOK_MAGICS = (
+    0x00800124C0081080, 0x0240100040002004, 0x0200102200400880, 0x8080100080080004,
+    0x1080080002040081, 0x0180020080030400, 0x0400080201009430, 0x008001000058A280,
+    0x0001002041008005, 0x1060400040201006, 0x0082808020001000, 0x1241001001000B20,
+    0x1800800800040080, 0x001A001008050200, 0x0404808002000100, 0x0101000080510022,
+    0x0038450020800100, 0x0880404010002000, 0x0120010020110040, 0xC118808010000802,
+    0x01A0808008000400, 0x0008808002000400, 0x8180040001420810, 0x002206000042840B,
+    0x4000400180022080, 0x1200200240100242, 0x2200401100200100, 0x1062100480080082,
+    0x0208008880040080, 0x0000040080020080, 0x301A010080800200, 0x0000008200004124,
+    0x9880004000402000, 0x04D0002000400052, 0x1000410019002000, 0x0008420012002008,
+    0x0800800400800801, 0x0078020080800400, 0x300008A204000110, 0x4000408042000104,
+    0x0840008000488020, 0x0010002000404000, 0x0052004080120020, 0x0A21041000090020,
+    0x50B0040801010010, 0x2002000804010100, 0x0500080102040010, 0x0200410040820004,
+    0x0016010044208200, 0x8000822004400880, 0x0000402200108200, 0x1110000800801080,
+    0x0B18100500080100, 0x4900040002008080, 0x8801000402000100, 0x1100008054090200,
+    0x0001044020108003, 0x0002022248801102, 0x4002001020420982, 0x6000200C400A0006,
+    0x8102010810200402, 0x5002004408015002, 0x6000100201208804, 0xC418130408204082,
+)
+
+BISHOP_MAGICS = (
+    0x2120241040850010, 0x0010301214822418, 0x0008182040844000, 0x0A08208020000C40,
+    0x010510C008000000, 0x180082A060000490, 0x02430C0202415400, 0x0010440218020208,
+    0x41000AD090008100, 0x4008100420940048, 0x0A00410401004002, 0x6200082042401600,
+    0x0411240420010000, 0x0200010160100CA0, 0x200080849010D002, 0x2210011042100414,
+    0x8004926028300100, 0x8010000210210104, 0x0008000488210200, 0x0324008202120000,
+    0x040C022480A00182, 0x0009404201100154, 0x1A10441108267020, 0x0800890C40441000,
+    0x0422206208085018, 0x00B00800302200A6, 0xA000404084010202, 0x2008840008041010,
+    0x4020808010082000, 0x040081018A010080, 0x200102000110B000, 0x01140080810090B2,
+    0x0010090410610400, 0x8008121302880804, 0x8204020100122400, 0x0000200800190050,
+    0x2062020200040084, 0x02A0208082810800, 0x4010010240010C38, 0x0001640020010100,
+    0x1002100C14006100, 0x0804020804244201, 0x0304101088001011, 0x420800205800C302,
+    0x1000284100401400, 0xE011410116000B00, 0x4408020444003C48, 0x0810208081003080,
+    0x000088084210A842, 0x0082009094300200, 0x411002004A088802, 0x008A000784340000,
+    0x0008910810240008, 0x00000A2008208044, 0x0008488800A41404, 0x0002841440820022,
+    0x014A044048280800, 0x0042090041046000, 0x0600212044240400, 0x0010400000208840,
+    0x0240020010820200, 0x0020840410820208, 0x0400222002008101, 0x4121041002004211,
+)
+
+## Directions of the orthogonal and diagonal sliders as the fill to use, the
+## distance between two consecutive squares, and the squares a step may land
+## on without wrapping around the board
+ROOK_DIRECTIONS = (
+    (fill_up, 8, MASK64), (fill_down, 8, MASK64),
+    (fill_up, 1, NOT_A_FILE), (fill_down, 1, NOT_H_FILE),
+)
+BISHOP_DIRECTIONS = (
+    (fill_up, 9, NOT_A_FILE), (fill_up, 7, NOT_H_FILE),
+    (fill_down, 7, NOT_A_FILE), (fill_down, 9, NOT_H_FILE),
+)
+
+def occluded_attacks(sliders, occupied, directions: tuple):
+    """
+    Generate the squares attacked by sliding pieces given the occupancy of
+    the board using occluded Kogge-Stone fills, works elementwise on uint64
+    arrays of slider and occupancy bitboards
+    Parameters:
+        sliders: bitboard of the sliding pieces
+        occupied: bitboard of all occupied squares blocking the sliders
+        directions: tuple of fill, shift and landing mask of every direction
+        the sliders move in
+    Return:
+        bitboard of all attacked squares, up to and including the first
+        blocker in every direction
+    """
+    empty = ~occupied & MASK64
+    attacks = sliders & 0
+    for fill, shift, landing in directions:
+        reach = fill(sliders, empty & landing, shift)
+        if fill is fill_up:
+            attacks = attacks | (reach << shift) & landing
+        else:
+            attacks = attacks | (reach >> shift) & landing
+    return attacks
+
+def build_magic_entry(from_square: int, mask: int, magic: int, directions: tuple,
+                      shared_attacks: dict) -> tuple:
+    """
+    Build the magic bitboard lookup of a sliding piece on a single square by
+    evaluating the attacks for every subset of its relevant occupancy at once
+    Parameters:
+        from_square: square of the sliding piece
+        mask: relevant occupancy bitboard of the sliding piece, i.e. its
+        empty board attacks without the edge squares of every ray
+        magic: magic multiplier of the square
+        directions: tuple of fill, shift and landing mask of every direction
+        the slider moves in
+        shared_attacks: dictionary of the attack bitboards seen so far mapping
+        each onto itself, shared between all entries
+    Return:
+        tuple of the mask, magic, shift and attack table of the square
+    """
+    bits = bitboard_to_squares(mask)
+    shift = BOARD_SQUARES - len(bits)
+    ## Spread the bits of every subset index over the relevant squares
+    index = np.arange(1 << len(bits), dtype=np.uint64)
+    occupancies = np.zeros_like(index)
+    for position, square in enumerate(bits):
+        occupancies |= ((index >> np.uint64(position)) & np.uint64(1)) << np.uint64(square)
+    sliders = np.full_like(index, 1 << from_square)
+    attacks = occluded_attacks(sliders, occupancies, directions)
+    ## The uint64 product wraps around exactly like the 64 bit magic product
+    table = np.zeros_like(index)
+    table[(occupancies * np.uint64(magic)) >> np.uint64(shift)] = attacks
+    ## Most subsets share their attacks with many others, the same Python int
+    ## is reused for equal attacks instead of holding a separate copy of it
+    return mask, magic, shift, tuple(shared_attacks.setdefault(attack, attack)
+                                     for attack in table.tolist())
+
+def build_magic_tables() -> tuple:
+    """
+    Build the rook and bishop magic bitboard lookups for every square
+    Return:
+        tuple indexed by square of the rook and bishop lookups, each a tuple
+        of the mask, magic, shift and attack table. Both pieces of a square
+        are stored next to each other for queen lookups
+    """
+    edges = RANK_1 | RANK_8 | FILE_A | FILE_H
+    shared_attacks = {}
+    magics = []
+    for square in range(BOARD_SQUARES):
+        ## Squares at the end of a ray are attacked regardless of whether
+        ## they are occupied, only the inner squares of a ray are relevant
+        rook_mask = ((FILE_ATTACKS[square] & ~(RANK_1 | RANK_8)) |
+                     (RANK_ATTACKS[square] & ~(FILE_A | FILE_H)))
+        bishop_mask = DIAGONAL_ATTACKS[square] & ~edges
+        magics.append((build_magic_entry(square, rook_mask, ROOK_MAGICS[square],
+                                         ROOK_DIRECTIONS, shared_attacks),
+                       build_magic_entry(square, bishop_mask, BISHOP_MAGICS[square],
+                                         BISHOP_DIRECTIONS, shared_attacks)))
+    return tuple(magics)
+
+## The magic tables hold over a hundred thousand entries, with the attack
+## bitboards shared between them still about a megabyte of tuples. Hyperbola
+## Quintessence only needs the line masks and the first rank table of a few
+## kilobytes but is about five times slower per lookup in the interpreter, so
+## magics stay the default and the lookups fall back to the generators below
+## when this is switched off
+USE_MAGIC_BITBOARDS = True
+MAGICS = build_magic_tables() if USE_MAGIC_BITBOARDS else ()
+## The lookups of each kind of slider in a flat tuple of their own, saving the
+## second index into MAGICS on every lookup
+ROOK_MAGIC_LOOKUPS = tuple(rook for rook, bishop in MAGICS)
+BISHOP_MAGIC_LOOKUPS = tuple(bishop for rook, bishop in MAGICS)
+
+def magic_rook_attack(from_square: int, occupied: int) -> int:
+    """
+    Look up the squares attacked by a rook given the occupancy of the board
+    Parameters:
+        from_square: square from which the rook is attacking
+        occupied: bitboard of all occupied squares blocking the rook
+    Return:
+        bitboard of all attacked squares by a rook, up to and including
+        the first blocker in every direction
+    """
+    mask, magic, shift, attacks = ROOK_MAGIC_LOOKUPS[from_square]
+    return attacks[((occupied & mask) * magic & MASK64) >> shift]
+
+def magic_bishop_attack(from_square: int, occupied: int) -> int:
+    """
+    Look up the squares attacked by a bishop given the occupancy of the board
+    Parameters:
+        from_square: square from which the bishop is attacking
+        occupied: bitboard of all occupied squares blocking the bishop
+    Return:
+        bitboard of all attacked squares by a bishop, up to and including
+        the first blocker in every direction
+    """
+    mask, magic, shift, attacks = BISHOP_MAGIC_LOOKUPS[from_square]
+    return attacks[((occupied & mask) * magic & MASK64) >> shift]
+
+def magic_queen_attack(from_square: int, occupied: int) -> int:
+    """
+    Look up the squares attacked by a queen given the occupancy of the board
+    Parameters:
+        from_square: square from which the queen is attacking
+        occupied: bitboard of all occupied squares blocking the queen
+    Return:
+        bitboard of all attacked squares by a queen, up to and including
+        the first blocker in every direction
+    """
+    mask, magic, shift, attacks = ROOK_MAGIC_LOOKUPS[from_square]
+    queen = attacks[((occupied & mask) * magic & MASK64) >> shift]
+    mask, magic, shift, attacks = BISHOP_MAGIC_LOOKUPS[from_square]
+    return queen | attacks[((occupied & mask) * magic & MASK64) >> shift]
+
+if not USE_MAGIC_BITBOARDS:
+    magic_rook_attack = generate_rook_attack_bitboard
+    magic_bishop_attack = generate_bishop_attack_bitboard
+    magic_queen_attack = generate_queen_attack_bitboard
+
+## ---------------------------------------------------- ##
+## Squares between two squares on a shared line         ##
+## ---------------------------------------------------- ##
+
+def between_squares(from_square: int, to_square: int) -> int:
+    """
+    Generate the squares strictly between two squares that share a rank, file
+    or diagonal. Each square blocks the slider on the other, so the attacks
+    of both only overlap on the squares between them
+    Parameters:
+        from_square: square index of the first square
+        to_square: square index of the second square
+    Return:
+        bitboard of the squares between both squares, empty when they do not
+        share a line or are neighbours
+    """
+    from_bb = 1 << from_square
+    to_bb = 1 << to_square
+    if ROOK_ATTACKS[from_square] & to_bb:
+        return magic_rook_attack(from_square, to_bb) & magic_rook_attack(to_square, from_bb)
+    if BISHOP_ATTACKS[from_square] & to_bb:
+        return magic_bishop_attack(from_square, to_bb) & magic_bishop_attack(to_square, from_bb)
+    return 0
+
+## The squares between every pair of squares indexed by both squares, a slider
+## reaches a square on one of its lines when none of these are occupied
+BETWEEN_SQUARES = tuple(tuple(between_squares(from_square, to_square) for to_square in range(BOARD_SQUARES))
+                        for from_square in range(BOARD_SQUARES))
 
 ## ---------------------------------------------------- ##
 ## Generating the maps of all attacks for a given piece ##
@@ -357,144 +858,108 @@ def generate_black_pawn_move_bitboard(from_square: int) -> np.uint64:
 
 def rank_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static rank attack
+    Build a python dictionary from the precomputed static rank attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_rank_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(RANK_ATTACKS))
 
 def file_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static file attack
+    Build a python dictionary from the precomputed static file attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_file_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(FILE_ATTACKS))
 
 def diagonal_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static diagonal attack
+    Build a python dictionary from the precomputed static diagonal attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_diagonal_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(DIAGONAL_ATTACKS))
 
 def knight_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static knight attack
+    Build a python dictionary from the precomputed static knight attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_knight_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(KNIGHT_ATTACKS))
 
 def rook_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static rook attack
+    Build a python dictionary from the precomputed static rook attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_rook_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(ROOK_ATTACKS))
 
 def bishop_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static bishop attack
+    Build a python dictionary from the precomputed static bishop attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_bishop_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(BISHOP_ATTACKS))
 
 def queen_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static queen attack
+    Build a python dictionary from the precomputed static queen attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_queen_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(QUEEN_ATTACKS))
 
 def king_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static king attack
+    Build a python dictionary from the precomputed static king attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_king_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(KING_ATTACKS))
 
 def white_pawn_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static white pawn attack
+    Build a python dictionary from the precomputed static white pawn attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_white_pawn_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(WHITE_PAWN_ATTACKS))
 
 def black_pawn_attack_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static black pawn attack
+    Build a python dictionary from the precomputed static black pawn attack
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_black_pawn_attack_bitboard(i)
-    return attack_map
+    return dict(enumerate(BLACK_PAWN_ATTACKS))
 
 def white_pawn_move_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static white pawn move
+    Build a python dictionary from the precomputed static white pawn move
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_white_pawn_move_bitboard(i)
-    return attack_map
+    return dict(enumerate(WHITE_PAWN_MOVES))
 
 def black_pawn_move_maps() -> dict:
     """
-    Build a (static) python dictionary to represent the static black pawn move
+    Build a python dictionary from the precomputed static black pawn move
     patterns on an otherwise empty bitboard
     Returns:
         dictionary of all attack bitboards
     """
-    attack_map = {}
-    for i in range(BOARD_SQUARES):
-        attack_map[i] = generate_black_pawn_move_bitboard(i)
-    return attack_map
+    return dict(enumerate(BLACK_PAWN_MOVES))
@@ -5,24 +5,27 @@ including scanning functions, manipulation functions, and conversion functions.
 
 import string
 import numpy as np
-import math
 
 from Constants import Rank, File, LIGHT_SQUARES, DARK_SQUARES
 
+## Bitboards are plain Python integers, every operation that can push bits
+## beyond the 64th square is masked back onto the board with MASK64
+MASK64 = 0xFFFFFFFFFFFFFFFF
 
-def make_uint() -> np.uint64:
+
+def make_uint() -> int:
     """
     Returns:
-        an unsigned 64 bit integer with value equal to zero
+        an empty 64 bit bitboard, i.e. an integer with value equal to zero
     """
-    return np.uint64(0)
+    return 0
 
 
 ## ---------------------------------------- ##
 ##  Bit Querying/Manipulation Functions     ##
 ## ---------------------------------------- ##
 
-def set_bit(bitboard: np.uint64, bit: int or np.uint64) -> np.uint64:
+def set_bit(bitboard: int, bit: int) -> int:
     """
     Turn the given bit in a bitboard to a HOT bit if not the case,
     else do nothing
@@ -32,9 +35,9 @@ def set_bit(bitboard: np.uint64, bit: int or np.uint64) -> np.uint64:
     Returns
         a bitboard in which the given bit is set to HOT
     """
-    return bitboard | np.uint64(1) << np.uint64(bit)
+    return (bitboard | 1 << bit) & MASK64
 
-def set_bit_multi(bitboard: np.uint64, bits: list or np.array) -> np.uint64:
+def set_bit_multi(bitboard: int, bits: list or range) -> int:
     """
     Set multiple bits in a bitboard to HOT
     Parameters:
@@ -43,11 +46,14 @@ def set_bit_multi(bitboard: np.uint64, bits: list or np.array) -> np.uint64:
     Returns:
         a bitboard with the listed bits set to HOT
     """
+    ## Collect all bits in a single mask first so the loop body is one shift
+    ## and one OR instead of a set_bit call per bit
+    mask = 0
     for bit in bits:
-        bitboard = set_bit(bitboard, bit)
-    return bitboard
+        mask |= 1 << bit
+    return (bitboard | mask) & MASK64
 
-def clear_bit(bitboard: np.uint64, bit: int or np.uint64) -> np.uint64:
+def clear_bit(bitboard: int, bit: int) -> int:
     """
     Turn the given bit in a bitboard to a COLD bit if not the case,
     else do nothing
@@ -57,9 +63,9 @@ def clear_bit(bitboard: np.uint64, bit: int or np.uint64) -> np.uint64:
     Returns
         a bitboard in which the given bit is set to COLD
     """
-    return bitboard & ~(np.uint64(1) << np.uint64(bit))
+    return bitboard & ~(1 << bit) & MASK64
 
-def clear_bit_multi(bitboard: np.uint64, bits: list or np.array) -> np.uint64:
+def clear_bit_multi(bitboard: int, bits: list or range) -> int:
     """
     Set multiple bits in a bitboard to COLD
     Parameters:
@@ -68,25 +74,28 @@ def clear_bit_multi(bitboard: np.uint64, bits: list or np.array) -> np.uint64:
     Returns:
         a bitboard with the listed bits set to COLD
     """
+    mask = 0
     for bit in bits:
-        bitboard = clear_bit(bitboard, bit)
-    return bitboard
+        mask |= 1 << bit
+    return bitboard & ~mask & MASK64
 
 
-def forward_bitscan(bitboard: np.uint64) -> int:
+def forward_bitscan(bitboard: int) -> int:
     """
     Find the least significant bit from the given bitboard
     Parameters:
-        bitboad: bitboard to scan
+        bitboard: bitboard to scan
     Returns:
         integer representing the significant bit
     """
-    if not bitboard or (bitboard == np.uint64(0)):
+    if not bitboard:
         raise Exception("You can not scan an empty/non-existing bitboard...")
 
-    return int(math.log2(bitboard & -bitboard))
+    ## Isolating the lowest set bit leaves a power of two, its bit length is
+    ## one past the index of the bit, both are single C calls on a Python int
+    return (bitboard & -bitboard).bit_length() - 1
 
-def backward_bitscan(bitboard: np.uint64) -> int:
+def backward_bitscan(bitboard: int) -> int:
     """
     Find the position of the most significant bit (MSB) from the given bitboard
     Parameters:
@@ -94,18 +103,10 @@ def backward_bitscan(bitboard: np.uint64) -> int:
     Returns:
         integer giving the position of the MSB
     """
-    if not bitboard or (bitboard == np.uint64(0)):
+    if not bitboard:
         raise Exception("You can not scan an empty/non-existing bitboard...")
 
-    bitboard |= bitboard >> np.uint64(1)
-    bitboard |= bitboard >> np.uint64(2)
-    bitboard |= bitboard >> np.uint64(4)
-    bitboard |= bitboard >> np.uint64(8)
-    bitboard |= bitboard >> np.uint64(16)
-    bitboard |= bitboard >> np.uint64(32)
-    bitboard += np.uint64(1)
-
-    return int(math.log2(bitboard >> np.uint64(1)))
+    return bitboard.bit_length() - 1
 
 
 
@@ -113,32 +114,25 @@ def backward_bitscan(bitboard: np.uint64) -> int:
 ##  Bitboard Conversion Functions   ##
 ## -------------------------------- ##
 
-def bitboard_pprint(bitboard: np.uint64, board_size: int or np.uint64 = 8) -> None:
+def bitboard_pprint(bitboard: int, board_size: int = 8) -> None:
     """
     Pretty-prints the given bitboard as an 8x8 chess board
     Parameters:
         bitboard: the bitboard to pretty-print
     """
-    bitboard_string = bitboard_to_string(bitboard)
-    pretty_board = ''
-    display_rank = board_size
-    board = np.array([bitboard_string[i:i + board_size] for i in range(0, len(bitboard_string), board_size)])
-    for i, row in enumerate(board):
-        pretty_board += f'{display_rank} '
-        display_rank -= 1
-        for square in reversed(row):
-            if int(square):
-                pretty_board += ' ▓'
-                continue
-            pretty_board += ' ░'
-        pretty_board += '\n'
-    pretty_board += '  '
-    for char in string.ascii_uppercase[:board_size]:
-        pretty_board += f' {char}'
+    ## The binary string starts with the last square, reshaping it row by row
+    ## gives the ranks from top to bottom with the files in reversed order
+    bitboard_string = bitboard_to_string(bitboard, board_size * board_size)
+    bits = np.frombuffer(bitboard_string.encode(), dtype=np.uint8)
+    board = bits.reshape(board_size, board_size)[:, ::-1]
+    squares = np.where(board == ord('1'), ' ▓', ' ░')
+    rank_labels = [f'{board_size - i} ' for i in range(board_size)]
+    pretty_board = ''.join(label + ''.join(row) + '\n' for label, row in zip(rank_labels, squares))
+    pretty_board += '  ' + ''.join(f' {char}' for char in string.ascii_uppercase[:board_size])
     print(pretty_board)
 
 
-def bitboard_to_bytes(bitboard: np.uint64) -> bytes:
+def bitboard_to_bytes(bitboard: int) -> bytes:
     """
     Convert a bitboard to a Python bytes object representation
     Parameters:
@@ -146,9 +140,9 @@ def bitboard_to_bytes(bitboard: np.uint64) -> bytes:
     Returns:
         the byte representation of the given bitboard
     """
-    return bitboard.tobytes()
+    return int(bitboard).to_bytes(8, 'little')
 
-def bitboard_to_string(bitboard: np.uint64, board_size: int = 64) -> str:
+def bitboard_to_string(bitboard: int, board_size: int = 64) -> str:
     """
     Convert a bitboard into a binary string representation
     Parameters:
@@ -157,103 +151,168 @@ def bitboard_to_string(bitboard: np.uint64, board_size: int = 64) -> str:
     Returns:
         a string representation of the provided bitboard
     """
-    return format(bitboard, 'b').zfill(board_size)
+    return format(int(bitboard), 'b').zfill(board_size)
 
-def bitboard_to_squares(bitboard: np.uint64, board_size: int = 64) -> list:
+## Squares of the set bits of every byte value for every byte of a bitboard,
+## indexed by byte position and then byte value
+BYTE_SQUARES = [[tuple(8 * position + bit for bit in range(8) if value >> bit & 1)
+                 for value in range(256)] for position in range(8)]
+
+def bitboard_to_squares(bitboard: int, board_size: int = 64) -> list:
     """
     Return the squares that are occupied in a given bitboard
     Parameters:
         bitboard: the bitboard to find the occupied squares in
         board_size: the number of squars on the bitboard
     Returns:
-        a list of the occupied squares in a given bitboard
+        a list of the occupied squares in a given bitboard, loops that may stop
+        early should use the iterate_squares generator instead
     """
-    binary = bitboard_to_string(bitboard)
+    ## Sparse bitboards pop their least significant bit until they are empty,
+    ## one iteration per occupied square
+    if bitboard.bit_count() <= 4:
+        squares = []
+        while bitboard:
+            lsb = bitboard & -bitboard
+            squares.append(lsb.bit_length() - 1)
+            bitboard ^= lsb
+        return squares
+    ## Denser bitboards look up the squares of each non-empty byte at once
     squares = []
-    for i, bit in enumerate(reversed(binary)):
-        if int(bit):
-            squares.append(i)
+    for position, value in enumerate(bitboard.to_bytes(8, 'little')):
+        if value:
+            squares.extend(BYTE_SQUARES[position][value])
     return squares
 
+def iterate_squares(bitboard: int):
+    """
+    Iterate over the occupied squares of a given bitboard from the least
+    significant bit upwards
+    Parameters:
+        bitboard: the bitboard to iterate over
+    Returns:
+        a generator of the occupied squares, the bitboard is only scanned as
+        far as the caller iterates
+    """
+    while bitboard:
+        lsb = bitboard & -bitboard
+        yield lsb.bit_length() - 1
+        bitboard ^= lsb
+
 ## -------------------------------- ##
 ## Bitboard access of board regions ##
 ## -------------------------------- ##
 
+## Board regions are constants, they are computed once at import and the
+## accessor functions below only return them
+
+## Rank access
+RANK_1 = Rank.hex1
+RANK_2 = Rank.hex2
+RANK_3 = Rank.hex3
+RANK_4 = Rank.hex4
+RANK_5 = Rank.hex5
+RANK_6 = Rank.hex6
+RANK_7 = Rank.hex7
+RANK_8 = Rank.hex8
+
+## File access
+FILE_A = File.hexA
+FILE_B = File.hexB
+FILE_C = File.hexC
+FILE_D = File.hexD
+FILE_E = File.hexE
+FILE_F = File.hexF
+FILE_G = File.hexG
+FILE_H = File.hexH
+
+## Board regions
+CENTER = (FILE_D | FILE_E) & (RANK_3 | RANK_4)
+FLANKS = FILE_A | FILE_H
+CENTER_FILES = FILE_C | FILE_D | FILE_E | FILE_F
+KINGSIDE = FILE_E | FILE_F | FILE_G | FILE_H
+QUEENSIDE = FILE_A | FILE_B | FILE_C | FILE_D
+BLACKSIDE = RANK_5 | RANK_6 | RANK_7 | RANK_8
+WHITESIDE = RANK_1 | RANK_2 | RANK_3 | RANK_4
+
 ## Rank access
-def rank1() -> np.uint64:
-    return np.uint64(Rank.hex1)
+def rank1() -> int:
+    return RANK_1
 
-def rank2() -> np.uint64:
-    return np.uint64(Rank.hex1)
+def rank2() -> int:
+    return RANK_2
 
-def rank3() -> np.uint64:
-    return np.uint64(Rank.hex3)
+def rank3() -> int:
+    return RANK_3
 
-def rank4() -> np.uint64:
-    return np.uint64(Rank.hex4)
+def rank4() -> int:
+    return RANK_4
 
-def rank5() -> np.uint64:
-    return np.uint64(Rank.hex5)
+def rank5() -> int:
+    return RANK_5
 
-def rank6() -> np.uint64:
-    return np.uint64(Rank.hex6)
+def rank6() -> int:
+    return RANK_6
 
-def rank7() -> np.uint64:
-    return np.uint64(Rank.hex7)
+def rank7() -> int:
+    return RANK_7
 
-def rank8() -> np.uint64:
-    return np.uint64(Rank.hex8)
+def rank8() -> int:
+    return RANK_8
 
 ## File access
-def fileA() -> np.uint64:
-    return np.uint64(File.hexA)
+def fileA() -> int:
+    return FILE_A
 
-def fileB() -> np.uint64:
-    return np.uint64(File.hexB)
+def fileB() -> int:
+    return FILE_B
 
-def fileC() -> np.uint64:
-    return np.uint64(File.hexC)
+def fileC() -> int:
+    return FILE_C
 
-def fileD() -> np.uint64:
-    return np.uint64(File.hexD)
+def fileD() -> int:
+    return FILE_D
 
-def fileE() -> np.uint64:
-    return np.uint64(File.hexE)
+def fileE() -> int:
+    return FILE_E
 
-def fileF() -> np.uint64:
-    return np.uint64(File.hexF)
+def fileF() -> int:
+    return FILE_F
 
-def fileG() -> np.uint64:
-    return np.uint64(File.hexG)
+def fileG() -> int:
+    return FILE_G
 
-def fileH() -> np.uint64:
-    return np.uint64(File.hexH)
+def fileH() -> int:
+    return FILE_H
 
 ## Colour access
-def dark_suares() -> np.uint64:
-    return np.uint64(DARK_SQUARES)
+def dark_squares() -> int:
+    return DARK_SQUARES
+
+## Kept for backwards compatibility with the misspelled original name
+dark_suares = dark_squares
 
-def light_squares() -> np.uint64:
-    return np.uint64(LIGHT_SQUARES)
+def light_squares() -> int:
+    return LIGHT_SQUARES
 
 ## Board regions
-def center() -> np.uint64:
-    return (fileD() | fileE()) & (rank3() | rank4())
+def center() -> int:
+    return CENTER
 
-def flanks() -> np.uint64:
-    return fileA() | fileH()
+def flanks() -> int:
+    return FLANKS
 
-def center_files() -> np.uint64:
-    return fileC() | fileD() | fileE() | fileF()
+def center_files() -> int:
+    return CENTER_FILES
 
-def kingside() -> np.uint64:
-    return fileE() | fileF() | fileG() | fileH()
+def kingside() -> int:
+    return KINGSIDE
 
-def queenside() -> np.uint64:
-    return fileA() | fileB() | fileC() | fileD()
+def queenside() -> int:
+    return QUEENSIDE
 
-def blackside() -> np.uint64:
-    return rank5() | rank6() | rank7() | rank8()
+def blackside() -> int:
+    return BLACKSIDE
 
-def whiteside() -> np.uint64:
-    return rank1() | rank2() | rank3() | rank4()
+def whiteside() -> int:
+    return WHITESIDE
@@ -1,8 +1,32 @@
+import random
 import numpy as np
-from BitboardHelpers import make_uint, set_bit, set_bit_multi, clear_bit, clear_bit_multi, bitboard_to_squares
-from Attacks import knight_attack_maps, rook_attack_maps, bishop_attack_maps, queen_attack_maps, king_attack_maps, \
-                    white_pawn_move_maps, white_pawn_attack_maps, black_pawn_move_maps, black_pawn_attack_maps
-from Constants import File, Rank, HOT, Piece, Colour
+from BitboardHelpers import MASK64, iterate_squares
+from Attacks import KNIGHT_ATTACKS, ROOK_ATTACKS, BISHOP_ATTACKS, QUEEN_ATTACKS, KING_ATTACKS, \
+                    WHITE_PAWN_MOVES, WHITE_PAWN_ATTACKS, BLACK_PAWN_MOVES, BLACK_PAWN_ATTACKS, \
+                    magic_rook_attack, magic_bishop_attack, magic_queen_attack, \
+                    white_pawn_set_attacks, black_pawn_set_attacks, NOT_A_FILE, NOT_H_FILE
+from Constants import Piece, Colour, PIECE_LABELS
+
+## Piece bitboards of the starting position indexed by piece
+STARTING_BITBOARDS = (
+    ## White pieces
+    0x000000000000FF00, 0x0000000000000081, 0x0000000000000042,
+    0x0000000000000024, 0x0000000000000008, 0x0000000000000010,
+    ## Black pieces
+    0x00FF000000000000, 0x8100000000000000, 0x4200000000000000,
+    0x2400000000000000, 0x0800000000000000, 0x1000000000000000,
+)
+
+## Zobrist keys, random 64 bit numbers that are XORed together into a hash of
+## a position, one for every piece on every square, one for the side to move,
+## one for every combination of castling rights and one for every en passant
+## file; the generator is seeded so the keys are the same on every run
+ZOBRIST_RANDOM = random.Random(0x7E55C4E55)
+ZOBRIST_PIECES = tuple(tuple(ZOBRIST_RANDOM.getrandbits(64) for square in range(64))
+                       for piece in range(Piece.COUNT))
+ZOBRIST_SIDE = ZOBRIST_RANDOM.getrandbits(64)
+ZOBRIST_CASTLE = tuple(ZOBRIST_RANDOM.getrandbits(64) for rights in range(16))
+ZOBRIST_EN_PASSANT = tuple(ZOBRIST_RANDOM.getrandbits(64) for file in range(8))
 
 class Board():
     """
@@ -13,175 +37,176 @@ class Board():
     by a given piece on a given square.
     """
 
+    ## Boards are cloned for every position that is explored, fixed slots keep
+    ## the instance state in one small block without a per-instance dict
+    __slots__ = ("bb", "mailbox", "zobrist_key", "white_pieces", "black_pieces", "occupied_squares",
+                 "empty_squares", "letterbox_cache", "letterbox_dirty")
+
+    ## The attack tables are computed once at import in Attacks and are shared
+    ## as class attributes, constructing or cloning a board never touches them
+    knight_attacks = KNIGHT_ATTACKS
+    rook_attacks = ROOK_ATTACKS
+    bishop_attacks = BISHOP_ATTACKS
+    queen_attacks = QUEEN_ATTACKS
+    king_attacks = KING_ATTACKS
+
+    white_pawn_attack = WHITE_PAWN_ATTACKS
+    white_pawn_move = WHITE_PAWN_MOVES
+    black_pawn_attack = BLACK_PAWN_ATTACKS
+    black_pawn_move = BLACK_PAWN_MOVES
+
     def __init__(self):
 
         self.init_pieces()
+        self.update_white_pieces()
+        self.update_black_pieces()
+        self.update_occupied_squares()
 
-        self.knight_attacks = knight_attack_maps()
-        self.rook_attacks = rook_attack_maps()
-        self.bishop_attacks = bishop_attack_maps()
-        self.queen_attacks = queen_attack_maps()
-        self.king_attacks = king_attack_maps()
-
-        self.white_pawn_attack = white_pawn_attack_maps()
-        self.white_pawn_move = white_pawn_move_maps()
-        self.black_pawn_attack = black_pawn_attack_maps()
-        self.black_pawn_move = black_pawn_move_maps()
+        ## The letterbox is only rebuilt when the piece bitboards have changed
+        ## since it was last requested
+        self.letterbox_cache = np.full(shape = (8, 8), fill_value = "--", dtype = "<U2")
+        self.letterbox_dirty = True
 
     ## Board setup routine
     def init_pieces(self) -> None:
 
-        ## Create and set all white piece bitboards
-        self.white_pawn = make_uint()
-        self.white_pawn |= set_bit_multi(self.white_pawn, range(8, 16))
-        self.white_rook = make_uint()
-        self.white_rook |= set_bit_multi(self.white_rook, [0, 7])
-        self.white_knight = make_uint()
-        self.white_knight |= set_bit_multi(self.white_knight, [1, 6])
-        self.white_bishop = make_uint()
-        self.white_bishop |= set_bit_multi(self.white_bishop, [2, 5])
-        self.white_queen = make_uint()
-        self.white_queen |= set_bit(self.white_queen, 3)
-        self.white_king = make_uint()
-        self.white_king |= set_bit(self.white_king, 4)
-
-        ## Create and set all black piece bitboards
-        self.black_pawn = make_uint()
-        self.black_pawn |= set_bit_multi(self.black_pawn, range(48, 56))
-        self.black_rook = make_uint()
-        self.black_rook |= set_bit_multi(self.black_rook, [56, 63])
-        self.black_knight = make_uint()
-        self.black_knight |= set_bit_multi(self.black_knight, [57, 62])
-        self.black_bishop = make_uint()
-        self.black_bishop |= set_bit_multi(self.black_bishop, [58, 61])
-        self.black_queen = make_uint()
-        self.black_queen |= set_bit(self.black_queen, 59)
-        self.black_king = make_uint()
-        self.black_king |= set_bit(self.black_king, 60)
+        ## All piece bitboards are stored in a single list indexed by piece
+        self.bb = list(STARTING_BITBOARDS)
+        self.update_mailbox()
+
+    def update_mailbox(self) -> None:
+        """
+        Rebuild the mailbox, the piece standing on every square or None for an
+        empty square, and the Zobrist key of the piece placement from the piece
+        bitboards
+        """
+        mailbox = [None] * 64
+        zobrist_key = 0
+        for piece, bitboard in enumerate(self.bb):
+            for square in iterate_squares(bitboard):
+                mailbox[square] = piece
+                zobrist_key ^= ZOBRIST_PIECES[piece][square]
+        self.mailbox = mailbox
+        ## The piece placement part of the Zobrist hash is rebuilt together
+        ## with the mailbox and updated along with it afterwards
+        self.zobrist_key = zobrist_key
+
+    def clone(self) -> "Board":
+        """
+        Return an independent copy of the board without running the setup routines
+        Returns:
+            a new board with the same piece bitboards, occupancies and letterbox
+        """
+        board = Board.__new__(Board)
+        board.bb = self.bb.copy()
+        board.mailbox = self.mailbox.copy()
+        board.zobrist_key = self.zobrist_key
+        board.white_pieces = self.white_pieces
+        board.black_pieces = self.black_pieces
+        board.occupied_squares = self.occupied_squares
+        board.empty_squares = self.empty_squares
+        ## The cached letterbox is replaced and never written into, sharing it is safe
+        board.letterbox_cache = self.letterbox_cache
+        board.letterbox_dirty = self.letterbox_dirty
+        return board
 
     def to_letterbox(self) -> np.array:
 
-        letterbox = np.full(shape = (64), fill_value = "--", dtype = np.object_)
-        letterbox[bitboard_to_squares(self.white_pawn)] = "wP"
-        letterbox[bitboard_to_squares(self.white_rook)] = "wR"
-        letterbox[bitboard_to_squares(self.white_knight)] = "wN"
-        letterbox[bitboard_to_squares(self.white_bishop)] = "wB"
-        letterbox[bitboard_to_squares(self.white_queen)] = "wQ"
-        letterbox[bitboard_to_squares(self.white_king)] = "wK"
-        letterbox[bitboard_to_squares(self.black_pawn)] = "bP"
-        letterbox[bitboard_to_squares(self.black_rook)] = "bR"
-        letterbox[bitboard_to_squares(self.black_knight)] = "bN"
-        letterbox[bitboard_to_squares(self.black_bishop)] = "bB"
-        letterbox[bitboard_to_squares(self.black_queen)] = "bQ"
-        letterbox[bitboard_to_squares(self.black_king)] = "bK"
-
-        return letterbox.reshape(8, 8)
+        if not self.letterbox_dirty:
+            return self.letterbox_cache
+
+        ## Unpack the bytes of all piece bitboards at once into a 12x64 matrix
+        ## of bits, every set bit gives a piece and the square it stands on
+        bitboards = np.array(self.bb, dtype = "<u8").view(np.uint8).reshape(Piece.COUNT, 8)
+        bits = np.unpackbits(bitboards, axis = 1, bitorder = "little")
+        pieces, squares = np.nonzero(bits)
+
+        ## Fixed width strings are stored inline in the array instead of as
+        ## pointers to Python objects
+        letterbox = np.full(shape = (64), fill_value = "--", dtype = "<U2")
+        letterbox[squares] = PIECE_LABELS[pieces]
+
+        self.letterbox_cache = letterbox.reshape(8, 8)
+        self.letterbox_dirty = False
+        return self.letterbox_cache
 
     ## ---------------------------- ##
     ## Board access piece locations ##
     ## ---------------------------- ##
 
-    @property
-    def white_pieces(self):
-        return self.white_king | self.white_queen | self.white_rook | self.white_knight | self.white_bishop | self.white_pawn
-
-    @property
-    def black_pieces(self):
-        return self.black_king | self.black_queen | self.black_rook | self.black_knight | self.black_bishop | self.black_pawn
+    ## The occupancy bitboards white_pieces, black_pieces, occupied_squares and
+    ## empty_squares are plain attributes kept up to date by the routines below
+    ## whenever the piece bitboards change, reading them costs no work
+    def update_white_pieces(self) -> None:
+        bb = self.bb
+        self.white_pieces = bb[0] | bb[1] | bb[2] | bb[3] | bb[4] | bb[5]
 
-    @property
-    def occupied_squares(self):
-        return self.black_pieces | self.white_pieces
+    def update_black_pieces(self) -> None:
+        bb = self.bb
+        self.black_pieces = bb[6] | bb[7] | bb[8] | bb[9] | bb[10] | bb[11]
 
-    @property
-    def empty_squares(self):
-        return ~self.occupied_squares
+    def update_occupied_squares(self) -> None:
+        self.occupied_squares = self.white_pieces | self.black_pieces
+        self.empty_squares = ~self.occupied_squares & MASK64
 
+    ## Pawn attacks of the full pawn sets, plain int shifts masked with the
+    ## precomputed edge files
     @property
     def white_pawn_east_attacks(self):
-        return (self.white_pawn << np.uint(9)) & ~np.uint64(File.hexA)
+        return (self.bb[Piece.wP] << 9) & NOT_A_FILE
 
     @property
     def white_pawn_west_attacks(self):
-        return (self.white_pawn << np.uint(7)) & ~np.uint64(File.hexH)
+        return (self.bb[Piece.wP] << 7) & NOT_H_FILE
 
     @property
     def white_pawn_attacks(self):
-        return self.white_pawn_east_attacks | self.white_pawn_west_attacks
+        return white_pawn_set_attacks(self.bb[Piece.wP])
 
     @property
     def black_pawn_east_attacks(self):
-        return (self.black_pawn >> np.uint(7)) & ~np.uint64(File.hexA)
+        return (self.bb[Piece.bP] >> 7) & NOT_A_FILE
 
     @property
     def black_pawn_west_attacks(self):
-        return (self.black_pawn >> np.uint(9)) & ~np.uint64(File.hexH)
+        return (self.bb[Piece.bP] >> 9) & NOT_H_FILE
 
     @property
     def black_pawn_attacks(self):
-        return self.black_pawn_east_attacks | self.black_pawn_west_attacks
+        return black_pawn_set_attacks(self.bb[Piece.bP])
 
     ## ---------------------------- ##
     ## Update position bitboards    ##
     ## ---------------------------- ##
 
-    def update_position_bitboards(self, change_map):
+    def toggle_piece(self, piece, squares):
         """
-        Given the map of pieces that has changed position, update the position
-        bitboards accordingly. For efficiency only those that have changed position
+        Toggle the given squares on the bitboard of a piece and apply the same
+        change to the occupancy bitboards, without recomputing them
+        Parameters:
+            piece: the piece to add to or remove from the squares
+            squares: bitboard of the squares to toggle, e.g. from and to square
         """
-
-        for key, val in change_map.items():
-
-            # White Pieces
-            if key == Piece.wP:
-                self.white_pawn = np.uint64(0)
-                self.white_pawn |= set_bit_multi(self.white_pawn, list(val))
-
-            elif key == Piece.wR:
-                self.white_rook = np.uint64(0)
-                self.white_rook |= set_bit_multi(self.white_rook, list(val))
-
-            elif key == Piece.wN:
-                self.white_knight = np.uint64(0)
-                self.white_knight |= set_bit_multi(self.white_knight, list(val))
-
-            elif key == Piece.wB:
-                self.white_bishop = np.uint64(0)
-                self.white_bishop |= set_bit_multi(self.white_bishop, list(val))
-
-            elif key == Piece.wQ:
-                self.white_queen = np.uint64(0)
-                self.white_queen |= set_bit_multi(self.white_queen, list(val))
-
-            elif key == Piece.wK:
-                self.white_king = np.uint64(0)
-                self.white_king |= set_bit_multi(self.white_king, list(val))
-
-            # Black Pieces
-            if key == Piece.bP:
-                self.black_pawn = np.uint64(0)
-                self.black_pawn |= set_bit_multi(self.black_pawn, list(val))
-
-            elif key == Piece.bR:
-                self.black_rook = np.uint64(0)
-                self.black_rook |= set_bit_multi(self.black_rook, list(val))
-
-            elif key == Piece.bN:
-                self.black_knight = np.uint64(0)
-                self.black_knight |= set_bit_multi(self.black_knight, list(val))
-
-            elif key == Piece.bB:
-                self.black_bishop = np.uint64(0)
-                self.black_bishop |= set_bit_multi(self.black_bishop, list(val))
-
-            elif key == Piece.bQ:
-                self.black_queen = np.uint64(0)
-                self.black_queen |= set_bit_multi(self.black_queen, list(val))
-
-            elif key == Piece.bK:
-                self.black_king = np.uint64(0)
-                self.black_king |= set_bit_multi(self.black_king, list(val))
+        self.bb[piece] ^= squares
+        ## The squares the piece leaves become empty, the others now hold it
+        mailbox = self.mailbox
+        zobrist_pieces = ZOBRIST_PIECES[piece]
+        ## Every move toggles a few squares, popping their bits in place and
+        ## scanning them with bit_length saves the generator and its frame
+        remaining = squares
+        while remaining:
+            lsb = remaining & -remaining
+            square = lsb.bit_length() - 1
+            mailbox[square] = None if mailbox[square] == piece else piece
+            self.zobrist_key ^= zobrist_pieces[square]
+            remaining ^= lsb
+        if piece < Piece.bP:
+            self.white_pieces ^= squares
+        else:
+            self.black_pieces ^= squares
+        self.occupied_squares = self.white_pieces | self.black_pieces
+        self.empty_squares = ~self.occupied_squares & MASK64
+        self.letterbox_dirty = True
 
     ## ---------------- ##
     ## Piece movements  ##
@@ -191,17 +216,25 @@ class Board():
     def get_knight_attack(self, square):
         return self.knight_attacks[square]
 
+    ## Sliding piece movement, the attacks stop at the first blocker in every
+    ## direction, by default the pieces on this board are the blockers
     ## Rook movement
-    def get_rook_attack(self, square):
-        return self.rook_attacks[square]
+    def get_rook_attack(self, square, occupied = None):
+        if occupied is None:
+            occupied = self.occupied_squares
+        return magic_rook_attack(square, occupied)
 
     ## Bishop movement
-    def get_bishop_attack(self, square):
-        return self.bishop_attacks[square]
+    def get_bishop_attack(self, square, occupied = None):
+        if occupied is None:
+            occupied = self.occupied_squares
+        return magic_bishop_attack(square, occupied)
 
     ## Queen movement
-    def get_queen_attack(self, square):
-        return self.queen_attacks[square]
+    def get_queen_attack(self, square, occupied = None):
+        if occupied is None:
+            occupied = self.occupied_squares
+        return magic_queen_attack(square, occupied)
 
     ## King movement
     def get_king_attack(self, square):
@@ -209,11 +242,11 @@ class Board():
 
     ## Pawn movement
     def get_pawn_move(self, colour, square):
-        if colour is Colour.WHITE:
-            return self.white_pawn_moves[square]
-        return self.black_pawn_moves[square]
+        if colour == Colour.WHITE:
+            return self.white_pawn_move[square]
+        return self.black_pawn_move[square]
 
     def get_pawn_attack(self, colour, square):
-        if colour is Colour.WHITE:
-            return self.white_pawn_attacks[square]
-        return self.black_pawn_attack_maps[square]
+        if colour == Colour.WHITE:
+            return self.white_pawn_attack[square]
+        return self.black_pawn_attack[square]
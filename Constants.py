@@ -1,10 +1,13 @@
 import numpy as np
 
-LIGHT_SQUARES = np.uint64(0x55AA55AA55AA55AA)
-DARK_SQUARES = ~LIGHT_SQUARES
-HOT = np.uint64(1)
+LIGHT_SQUARES = 0x55AA55AA55AA55AA
+DARK_SQUARES = LIGHT_SQUARES ^ 0xFFFFFFFFFFFFFFFF
+HOT = 1
 BOARD_SIZE = 8
 BOARD_SQUARES = BOARD_SIZE**2
+## Single square bitboard of every square, indexing the table is cheaper than
+## shifting a fresh int on every use
+SQUARE_BB = tuple(1 << square for square in range(BOARD_SQUARES))
 
 class Colour:
     WHITE = 0
@@ -12,21 +15,23 @@ class Colour:
 
 
 class Piece:
-    EMPTY = 0
-
-    wP = 1
-    wR = 2
-    wN = 3
-    wB = 4
-    wQ = 5
-    wK = 6
-
-    bP = 7
-    bR = 8
-    bN = 9
-    bB = 10
-    bQ = 11
-    bK = 12
+    ## Pieces double as indices into the list of piece bitboards of a board
+    wP = 0
+    wR = 1
+    wN = 2
+    wB = 3
+    wQ = 4
+    wK = 5
+
+    bP = 6
+    bR = 7
+    bN = 8
+    bB = 9
+    bQ = 10
+    bK = 11
+
+    EMPTY = 12
+    COUNT = 12
 
     white_pieces = {wP, wR, wN, wB, wQ, wK}
     black_pieces = {bP, bR, bN, bB, bQ, bK}
@@ -38,78 +43,83 @@ class Piece:
     QUEEN = "queen"
     KING = "king"
 
+## Two letter labels of all pieces indexed by piece, used to fill the board
+## letterbox and to name the piece images
+PIECE_LABELS = np.array(["wP", "wR", "wN", "wB", "wQ", "wK",
+                         "bP", "bR", "bN", "bB", "bQ", "bK"], dtype = "<U2")
+
 class Square:
-    A1 = np.uint64(0)
-    B1 = np.uint64(1)
-    C1 = np.uint64(2)
-    D1 = np.uint64(3)
-    E1 = np.uint64(4)
-    F1 = np.uint64(5)
-    G1 = np.uint64(6)
-    H1 = np.uint64(7)
-
-    A2 = np.uint64(8)
-    B2 = np.uint64(9)
-    C2 = np.uint64(10)
-    D2 = np.uint64(11)
-    E2 = np.uint64(12)
-    F2 = np.uint64(13)
-    G2 = np.uint64(14)
-    H2 = np.uint64(15)
-
-    A3 = np.uint64(16)
-    B3 = np.uint64(17)
-    C3 = np.uint64(18)
-    D3 = np.uint64(19)
-    E3 = np.uint64(20)
-    F3 = np.uint64(21)
-    G3 = np.uint64(22)
-    H3 = np.uint64(23)
-
-    A4 = np.uint64(24)
-    B4 = np.uint64(25)
-    C4 = np.uint64(26)
-    D4 = np.uint64(27)
-    E4 = np.uint64(28)
-    F4 = np.uint64(29)
-    G4 = np.uint64(30)
-    H4 = np.uint64(31)
-
-    A5 = np.uint64(32)
-    B5 = np.uint64(33)
-    C5 = np.uint64(34)
-    D5 = np.uint64(35)
-    E5 = np.uint64(36)
-    F5 = np.uint64(37)
-    G5 = np.uint64(38)
-    H5 = np.uint64(39)
-
-    A6 = np.uint64(40)
-    B6 = np.uint64(41)
-    C6 = np.uint64(42)
-    D6 = np.uint64(43)
-    E6 = np.uint64(44)
-    F6 = np.uint64(45)
-    G6 = np.uint64(46)
-    H6 = np.uint64(47)
-
-    A7 = np.uint64(48)
-    B7 = np.uint64(49)
-    C7 = np.uint64(50)
-    D7 = np.uint64(51)
-    E7 = np.uint64(52)
-    F7 = np.uint64(53)
-    G7 = np.uint64(54)
-    H7 = np.uint64(55)
-
-    A8 = np.uint64(56)
-    B8 = np.uint64(57)
-    C8 = np.uint64(58)
-    D8 = np.uint64(59)
-    E8 = np.uint64(60)
-    F8 = np.uint64(61)
-    G8 = np.uint64(62)
-    H8 = np.uint64(63)
+    A1 = 0
+    B1 = 1
+    C1 = 2
+    D1 = 3
+    E1 = 4
+    F1 = 5
+    G1 = 6
+    H1 = 7
+
+    A2 = 8
+    B2 = 9
+    C2 = 10
+    D2 = 11
+    E2 = 12
+    F2 = 13
+    G2 = 14
+    H2 = 15
+
+    A3 = 16
+    B3 = 17
+    C3 = 18
+    D3 = 19
+    E3 = 20
+    F3 = 21
+    G3 = 22
+    H3 = 23
+
+    A4 = 24
+    B4 = 25
+    C4 = 26
+    D4 = 27
+    E4 = 28
+    F4 = 29
+    G4 = 30
+    H4 = 31
+
+    A5 = 32
+    B5 = 33
+    C5 = 34
+    D5 = 35
+    E5 = 36
+    F5 = 37
+    G5 = 38
+    H5 = 39
+
+    A6 = 40
+    B6 = 41
+    C6 = 42
+    D6 = 43
+    E6 = 44
+    F6 = 45
+    G6 = 46
+    H6 = 47
+
+    A7 = 48
+    B7 = 49
+    C7 = 50
+    D7 = 51
+    E7 = 52
+    F7 = 53
+    G7 = 54
+    H7 = 55
+
+    A8 = 56
+    B8 = 57
+    C8 = 58
+    D8 = 59
+    E8 = 60
+    F8 = 61
+    G8 = 62
+    H8 = 63
 
 class File:
     A = {0, 8, 16, 24, 32, 40, 48, 56}
@@ -121,14 +131,14 @@ class File:
     G = {6, 14, 22, 30, 38, 46, 54, 62}
     H = {7, 15, 23, 31, 39, 47, 55, 63}
 
-    hexA = np.uint64(0x0101010101010101)
-    hexB = np.uint64(0x0202020202020202)
-    hexC = np.uint64(0x0404040404040404)
-    hexD = np.uint64(0x0808080808080808)
-    hexE = np.uint64(0x1010101010101010)
-    hexF = np.uint64(0x2020202020202020)
-    hexG = np.uint64(0x4040404040404040)
-    hexH = np.uint64(0x8080808080808080)
+    hexA = 0x0101010101010101
+    hexB = 0x0202020202020202
+    hexC = 0x0404040404040404
+    hexD = 0x0808080808080808
+    hexE = 0x1010101010101010
+    hexF = 0x2020202020202020
+    hexG = 0x4040404040404040
+    hexH = 0x8080808080808080
 
     files = [A, B, C, D, E, F, G, H]
 
@@ -142,22 +152,34 @@ class Rank:
     x7 = {48, 49, 50, 51, 52, 53, 54, 55}
     x8 = {56, 57, 58, 59, 60, 61, 62, 63}
 
-    hex1 = np.uint64(0x00000000000000FF)
-    hex2 = np.uint64(0x000000000000FF00)
-    hex3 = np.uint64(0x0000000000FF0000)
-    hex4 = np.uint64(0x00000000FF000000)
-    hex5 = np.uint64(0x000000FF00000000)
-    hex6 = np.uint64(0x0000FF0000000000)
-    hex7 = np.uint64(0x00FF000000000000)
-    hex8 = np.uint64(0xFF00000000000000)
+    hex1 = 0x00000000000000FF
+    hex2 = 0x000000000000FF00
+    hex3 = 0x0000000000FF0000
+    hex4 = 0x00000000FF000000
+    hex5 = 0x000000FF00000000
+    hex6 = 0x0000FF0000000000
+    hex7 = 0x00FF000000000000
+    hex8 = 0xFF00000000000000
 
     ranks = [x1, x2, x3, x4, x5, x6, x7, x8]
 
+class CastleRights:
+    ## Castling rights of both colours as bit flags of a single int, the two
+    ## rights of a colour are the two bits at twice its colour index
+    WhiteKingside = 1
+    WhiteQueenside = 2
+    BlackKingside = 4
+    BlackQueenside = 8
+    White = WhiteKingside | WhiteQueenside
+    Black = BlackKingside | BlackQueenside
+    All = White | Black
+
 class CastleRoute:
-    WhiteKingside = np.uint64(0x70)  # E1,F1,G1
-    WhiteQueenside = np.uint64(0x1c)  # E1, D1, C1
-    BlackKingside = np.uint64(0x1c00000000000000)  # E8,F8,G8
-    BlackQueenside = np.uint64(0x7000000000000000)  # E8, D8, C8
+    ## Squares the king stands on or passes over, none may be attacked
+    WhiteKingside = 0x70  # E1,F1,G1
+    WhiteQueenside = 0x1c  # E1, D1, C1
+    BlackKingside = 0x7000000000000000  # E8,F8,G8
+    BlackQueenside = 0x1c00000000000000  # E8, D8, C8
 
 piece_to_value = {
     Piece.wP: 1,
@@ -6,6 +6,8 @@ user-input and displaying the GameState object.
 import pygame as pg
 from Position import Position
 from Move import Move
+from Constants import Piece, PIECE_LABELS, user_promotion_input
+from BitboardHelpers import RANK_1, RANK_8
 
 DIMENSION = 8
 SQ_SIZE = 128
@@ -13,6 +15,13 @@ RSQ_SIZE = 120
 WIDTH = HEIGHT = DIMENSION * SQ_SIZE
 MAX_FPS = 30
 IMAGES = {}
+BOARD_COLOURS = [pg.Color("#fccc74"), pg.Color("#17178c")]
+## The rectangles of the squares and of the pieces placed on them never change,
+## they are built once instead of on every draw, indexed by row and column
+BOARD_RECTS = [[pg.Rect(column * SQ_SIZE, row * SQ_SIZE, SQ_SIZE, SQ_SIZE)
+                for column in range(DIMENSION)] for row in range(DIMENSION)]
+PIECE_RECTS = [[pg.Rect(column * SQ_SIZE + 4, row * SQ_SIZE + 4, RSQ_SIZE, RSQ_SIZE)
+                for column in range(DIMENSION)] for row in range(DIMENSION)]
 
 
 def load_images(image_folder: str) -> None:
@@ -26,14 +35,31 @@ def load_images(image_folder: str) -> None:
     if image_folder[-1] != "/":
         raise Exception("A directory path should end with a '/'")
 
-    pieces = ["wP", "wR", "wN", "wB", "wK", "wQ", "bP", "bR", "bN", "bB", "bK", "bQ"]
-    for piece in pieces:
+    for piece in PIECE_LABELS.tolist():
         try:
             IMAGES[piece] = pg.transform.scale(pg.image.load(image_folder + piece.lower() + ".png"), (RSQ_SIZE, RSQ_SIZE))
         except FileNotFoundError:
             IMAGES[piece] = pg.transform.scale(pg.image.load(image_folder + piece.lower() + ".svg"), (RSQ_SIZE, RSQ_SIZE))
 
 
+def prompt_promotion(move: Move) -> None:
+    """
+    Ask the player which piece a pawn promotes to and store it on the move,
+    the engine itself never asks for input
+    Parameters:
+        move: the pawn move that reaches the last rank
+    """
+    while True:
+        promotion_piece = input("Choose promotion piece")
+        promotion_piece = promotion_piece.lower()
+        legal_piece = user_promotion_input.get(promotion_piece)
+        if not legal_piece:
+            print("Please choose a legal promotion")
+            continue
+        move.promote_to = legal_piece
+        break
+
+
 def run_game():
     """
     The main driving function that runs the entire operation.
@@ -47,13 +73,23 @@ def run_game():
     load_images("Images/chessnut/")
     running = True
 
+    ## The squares never change, draw them once on a surface that is blitted
+    ## onto the screen whenever the pieces have to be redrawn, converting it
+    ## to the pixel format of the screen turns that blit into a plain copy
+    board_surface = pg.Surface((WIDTH, HEIGHT)).convert()
+    draw_board(board_surface)
+    redraw = True
+
     selected_square = ()
     player_clicks = []
     while running:
         for e in pg.event.get():
             if e.type == pg.QUIT:
                 running = False
+            elif e.type == pg.VIDEOEXPOSE:
+                redraw = True
             elif e.type == pg.MOUSEBUTTONDOWN:
+                redraw = True
                 location = pg.mouse.get_pos()
                 column, row = location[0] // SQ_SIZE, location[1] // SQ_SIZE
                 print(column, row)
@@ -69,22 +105,28 @@ def run_game():
                     piece = ps.get_piece_on_square(from_square)
                     print(piece, from_square, to_square)
                     move = Move(piece, (from_square, to_square))
-                    ps.make_move(move)
+                    if piece in (Piece.wP, Piece.bP) and move.to_bb & (RANK_1 | RANK_8):
+                        prompt_promotion(move)
+                    move_result = ps.make_move(move)
+                    if move_result.is_illegal_move:
+                        print(move_result.message)
                     selected_square = ()
                     player_clicks = []
-        draw_board(screen)
-        draw_pieces(screen, ps)
+        ## Only render a new frame when a click may have changed the position
+        if redraw:
+            screen.blit(board_surface, (0, 0))
+            draw_pieces(screen, ps)
+            pg.display.flip()
+            redraw = False
         clock.tick(MAX_FPS)
-        pg.display.flip()
 
 
 
 def draw_board(screen: pg.display) -> None:
-    colors = [pg.Color("#fccc74"), pg.Color("#17178c")]
     for row in range(DIMENSION):
         for column in range(DIMENSION):
-            color = colors[(row + column) % 2]
-            pg.draw.rect(screen, color, pg.Rect(column * SQ_SIZE, row * SQ_SIZE, SQ_SIZE, SQ_SIZE))
+            color = BOARD_COLOURS[(row + column) % 2]
+            pg.draw.rect(screen, color, BOARD_RECTS[row][column])
 
 def draw_pieces(screen: pg.display, ps: Position) -> None:
 
@@ -93,7 +135,7 @@ def draw_pieces(screen: pg.display, ps: Position) -> None:
         for column in range(DIMENSION):
             piece = board[row, column]
             if piece != "--":
-                screen.blit(IMAGES[piece], pg.Rect(column * SQ_SIZE + 4, row * SQ_SIZE + 4, RSQ_SIZE, RSQ_SIZE))
+                screen.blit(IMAGES[piece], PIECE_RECTS[row][column])
 
 if __name__ == "__main__":
     run_game()
@@ -1,15 +1,26 @@
-from Constants import Piece, Colour
+from Constants import Piece, SQUARE_BB
 
 class Move():
 
+    ## Moves are created for every candidate move, fixed slots keep them small
+    ## and make attribute access an offset lookup instead of a dict lookup
+    __slots__ = ("piece", "colour", "from_square", "to_square", "from_bb", "to_bb", "is_capture",
+                 "is_en_passant", "is_castling", "is_promotion", "promote_to")
+
     def __init__(self, piece, squares: tuple[int, int]):
         self.piece = piece
+        ## The piece of a move never changes, its colour is only set once, all
+        ## white pieces are numbered below the black pawn so one comparison
+        ## replaces the set membership test
+        self.colour = int(piece is None or piece >= Piece.bP)
+        ## Moves without squares leave both slots unset, reading them fails
+        ## loudly instead of passing None on as a square
         if squares:
-            self.from_square = squares[0]
-            self.to_square = squares[1]
-        else:
-            self.from_square = None
-            self.to_square = None
+            self.from_square, self.to_square = squares
+            ## Single bit bitboards of both squares, computed once for all
+            ## legality checks of the move
+            self.from_bb = SQUARE_BB[self.from_square]
+            self.to_bb = SQUARE_BB[self.to_square]
 
         self.is_capture = False
         self.is_en_passant = False
@@ -17,15 +28,11 @@ class Move():
         self.is_promotion = False
         self.promote_to = None
 
-
-    @property
-    def colour(self):
-        if self.piece in Piece.white_pieces:
-            return Colour.WHITE
-        return Colour.BLACK
-
 class MoveResult():
 
+    __slots__ = ("is_checkmate", "is_king_check", "is_stalemate",
+                 "is_draw_claim_allowed", "is_illegal_move", "fen", "message")
+
     def __init__(self):
         self.is_checkmate = False
         self.is_king_check = False
@@ -33,3 +40,6 @@ class MoveResult():
         self.is_draw_claim_allowed = False
         self.is_illegal_move = False
         self.fen = ''
+        ## Why a move was rejected, shown by the user interface instead of
+        ## printed while the move is checked
+        self.message = ''
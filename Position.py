@@ -1,45 +1,150 @@
-import copy
-import numpy as np
-
-from Board import Board
-from Constants import File, Rank, HOT, Piece, Colour, CastleRoute, Square, piece_to_value, \
-                      user_promotion_input, white_promotion_map, black_promotion_map
-from BitboardHelpers import set_bit, set_bit_multi, clear_bit, clear_bit_multi, forward_bitscan, backward_bitscan, \
-                            bitboard_to_string, bitboard_to_squares, bitboard_pprint, make_uint
-from Attacks import south_ray, north_ray, west_ray, east_ray, southwest_ray, southeast_ray, northwest_ray, northeast_ray, \
-                    generate_king_attack_bitboard
+from operator import attrgetter
+from Board import Board, ZOBRIST_SIDE, ZOBRIST_CASTLE, ZOBRIST_EN_PASSANT
+from Constants import Piece, Colour, CastleRights, CastleRoute, Square, piece_to_value, \
+                      white_promotion_map, black_promotion_map, SQUARE_BB
+from BitboardHelpers import bitboard_to_squares, RANK_1, RANK_2, RANK_4, RANK_5, RANK_7, RANK_8
+from Attacks import KNIGHT_ATTACKS, ROOK_ATTACKS, BISHOP_ATTACKS, QUEEN_ATTACKS, KING_ATTACKS, \
+                    magic_rook_attack, magic_bishop_attack, magic_queen_attack, BETWEEN_SQUARES, \
+                    WHITE_PAWN_ATTACKS, BLACK_PAWN_ATTACKS, \
+                    knight_set_attacks, king_set_attacks, white_pawn_set_attacks, black_pawn_set_attacks, \
+                    white_pawn_set_pushes, black_pawn_set_pushes
 from Move import Move, MoveResult
 
-class PositionState():
+## Names of all attack bitboards of a position, in the order they are stored in
+## an undo record
+ATTACK_BITBOARDS = ("white_pawn_moves", "white_pawn_attacks", "white_rook_attacks",
+                    "white_knight_attacks", "white_bishop_attacks", "white_queen_attacks",
+                    "white_king_attacks", "black_pawn_moves", "black_pawn_attacks",
+                    "black_rook_attacks", "black_knight_attacks", "black_bishop_attacks",
+                    "black_queen_attacks", "black_king_attacks",
+                    "white_attacked_squares", "black_attacked_squares")
+## Reads all of them from a position in a single C level call
+get_attack_bitboards = attrgetter(*ATTACK_BITBOARDS)
+
+## Attack bitboard of every piece on a position and static attack table of every
+## piece other than the pawns, both indexed by piece
+PIECE_ATTACK_BITBOARDS = ("white_pawn_attacks", "white_rook_attacks", "white_knight_attacks",
+                          "white_bishop_attacks", "white_queen_attacks", "white_king_attacks",
+                          "black_pawn_attacks", "black_rook_attacks", "black_knight_attacks",
+                          "black_bishop_attacks", "black_queen_attacks", "black_king_attacks")
+## Attack updater of every piece indexed by piece, with the colour it is called
+## with and the extra arguments it takes: the attack bitboard it writes and the
+## attack function it fills it with. A single lookup per changed piece replaces
+## branching on the kind of piece
+PIECE_ATTACK_UPDATERS = (
+    ("update_pawn_set_moves", Colour.WHITE, ()),
+    ("update_slider_attacks", Colour.WHITE, ("white_rook_attacks", magic_rook_attack)),
+    ("update_set_attacks", Colour.WHITE, ("white_knight_attacks", knight_set_attacks)),
+    ("update_slider_attacks", Colour.WHITE, ("white_bishop_attacks", magic_bishop_attack)),
+    ("update_slider_attacks", Colour.WHITE, ("white_queen_attacks", magic_queen_attack)),
+    ("update_set_attacks", Colour.WHITE, ("white_king_attacks", king_set_attacks)),
+    ("update_pawn_set_moves", Colour.BLACK, ()),
+    ("update_slider_attacks", Colour.BLACK, ("black_rook_attacks", magic_rook_attack)),
+    ("update_set_attacks", Colour.BLACK, ("black_knight_attacks", knight_set_attacks)),
+    ("update_slider_attacks", Colour.BLACK, ("black_bishop_attacks", magic_bishop_attack)),
+    ("update_slider_attacks", Colour.BLACK, ("black_queen_attacks", magic_queen_attack)),
+    ("update_set_attacks", Colour.BLACK, ("black_king_attacks", king_set_attacks)),
+)
+PIECE_ATTACK_TABLES = (None, ROOK_ATTACKS, KNIGHT_ATTACKS, BISHOP_ATTACKS, QUEEN_ATTACKS, KING_ATTACKS) * 2
+## Occupancy aware magic bitboard lookups of the sliding pieces indexed by piece,
+## None for the pieces whose attacks do not depend on blockers
+PIECE_SLIDER_ATTACKS = (None, magic_rook_attack, None, magic_bishop_attack, magic_queen_attack, None) * 2
+
+## Pieces that count towards the material of each colour with their values,
+## the kings are left out
+WHITE_VALUED_PIECES = tuple((piece, piece_to_value[piece]) for piece in (Piece.wP, Piece.wR, Piece.wN, Piece.wB, Piece.wQ))
+BLACK_VALUED_PIECES = tuple((piece, piece_to_value[piece]) for piece in (Piece.bP, Piece.bR, Piece.bN, Piece.bB, Piece.bQ))
+
+## Target squares of the king in a castling move of each colour
+WHITE_CASTLE_TARGETS = (1 << Square.G1) | (1 << Square.C1)
+BLACK_CASTLE_TARGETS = (1 << Square.G8) | (1 << Square.C8)
+## Rook of each colour indexed by colour, and the from and to squares of the
+## rook as a single bitboard keyed by the target square of the castling king
+CASTLE_ROOKS = (Piece.wR, Piece.bR)
+CASTLE_ROOK_TOGGLES = {
+    Square.G1 : (1 << Square.H1) | (1 << Square.F1),
+    Square.C1 : (1 << Square.A1) | (1 << Square.D1),
+    Square.G8 : (1 << Square.H8) | (1 << Square.F8),
+    Square.C8 : (1 << Square.A8) | (1 << Square.D8),
+}
+
+## Squares that may not be attacked and squares that have to be empty when
+## castling indexed by colour and by side with the kingside first
+CASTLE_ROUTES = ((CastleRoute.WhiteKingside, CastleRoute.WhiteQueenside),
+                 (CastleRoute.BlackKingside, CastleRoute.BlackQueenside))
+CASTLE_PATHS = ((BETWEEN_SQUARES[Square.E1][Square.H1], BETWEEN_SQUARES[Square.E1][Square.A1]),
+                (BETWEEN_SQUARES[Square.E8][Square.H8], BETWEEN_SQUARES[Square.E8][Square.A8]))
+
+## Castling rights that remain after a move from or to a square, indexed by
+## square. Only the king and rook starting squares clear any rights
+CASTLE_RIGHTS_MASKS = [CastleRights.All] * 64
+CASTLE_RIGHTS_MASKS[Square.E1] &= ~CastleRights.White
+CASTLE_RIGHTS_MASKS[Square.H1] &= ~CastleRights.WhiteKingside
+CASTLE_RIGHTS_MASKS[Square.A1] &= ~CastleRights.WhiteQueenside
+CASTLE_RIGHTS_MASKS[Square.E8] &= ~CastleRights.Black
+CASTLE_RIGHTS_MASKS[Square.H8] &= ~CastleRights.BlackKingside
+CASTLE_RIGHTS_MASKS[Square.A8] &= ~CastleRights.BlackQueenside
+CASTLE_RIGHTS_MASKS = tuple(CASTLE_RIGHTS_MASKS)
+## Single square bitboards of the castling rook and king squares, built once
+## instead of on every castling check
+H1_BB, A1_BB, H8_BB, A8_BB = (1 << Square.H1), (1 << Square.A1), (1 << Square.H8), (1 << Square.A8)
+G1_BB, C1_BB, G8_BB, C8_BB = (1 << Square.G1), (1 << Square.C1), (1 << Square.G8), (1 << Square.C8)
+## Target square of the king in a castling move indexed by colour and by side
+CASTLE_KING_TARGETS = ((G1_BB, C1_BB), (G8_BB, C8_BB))
+## Starting square of the castling rook indexed by colour and by side
+CASTLE_ROOK_SQUARES = ((H1_BB, A1_BB), (H8_BB, A8_BB))
+
+## Piece a pawn promotes to for every promotion piece kind, indexed by colour
+PROMOTION_MAPS = (white_promotion_map, black_promotion_map)
+
+## Order in which the pieces of each colour are probed for a legal move,
+## indexed by colour
+MOVE_PROBE_ORDER = ((Piece.wK, Piece.wQ, Piece.wR, Piece.wN, Piece.wB, Piece.wP),
+                    (Piece.bK, Piece.bQ, Piece.bR, Piece.bN, Piece.bB, Piece.bP))
+
+def any_slider_attack(pieces: int, slider_attack, occupied: int, targets: int) -> bool:
     """
-    A class to store all relevant rules and auxiliary information on a chess
-    board position from which one is able to restore from an earlier position
+    Check whether any of the given sliding pieces attacks any of the given
+    targets, taking the blocking pieces into account
+    Parameters:
+        pieces: bitboard of the squares of the sliding pieces
+        slider_attack: the magic bitboard lookup of the sliding piece
+        occupied: bitboard of all pieces that block the sliding pieces
+        targets: bitboard of the target squares
+    Returns:
+        True if and only if the attacks of at least one piece hit a target
     """
-    def __init__(self, kwargs):
-        self.board = kwargs['board']
-        self.colour_to_move = kwargs['colour_to_move']
-        self.castle_rights = kwargs['castle_rights']
-        self.en_passant_side = kwargs['en_passant_side']
-        self.en_passant_target = kwargs['en_passant_target']
-        self.is_en_passant_capture = kwargs['is_en_passant_capture']
-        self.halfmove_clock = kwargs['halfmove_clock']
-        self.halfmove = kwargs['halfmove']
-        self.king_in_check = kwargs['king_in_check']
-        self.piece_map = kwargs['piece_map']
-        self.white_pawn_moves = kwargs['white_pawn_moves']
-        self.white_pawn_attacks = kwargs['white_pawn_attacks']
-        self.white_knight_attacks = kwargs['white_pawn_attacks']
-        self.white_rook_attacks = kwargs['white_pawn_attacks']
-        self.white_bishop_attacks = kwargs['white_pawn_attacks']
-        self.white_queen_attacks = kwargs['white_pawn_attacks']
-        self.white_king_attacks = kwargs['white_pawn_attacks']
-        self.black_pawn_moves = kwargs['black_pawn_moves']
-        self.black_pawn_attacks = kwargs['black_pawn_attacks']
-        self.black_knight_attacks = kwargs['black_pawn_attacks']
-        self.black_rook_attacks = kwargs['black_pawn_attacks']
-        self.black_bishop_attacks = kwargs['black_pawn_attacks']
-        self.black_queen_attacks = kwargs['black_pawn_attacks']
-        self.black_king_attacks = kwargs['black_pawn_attacks']
+    while pieces:
+        lsb = pieces & -pieces
+        if slider_attack(lsb.bit_length() - 1, occupied) & targets:
+            return True
+        pieces ^= lsb
+    return False
+
+class UndoInfo():
+    """
+    The state a move changes in a position, recorded just before the move is
+    made so that it can be taken back without copying the whole position. The
+    pieces are not copied at all, the toggles applied to them while making the
+    move are recorded and applied once more to take the move back
+    """
+
+    __slots__ = ("toggles", "colour_to_move", "castle_rights", "en_passant_side", "en_passant_target",
+                 "material", "halfmove_clock", "halfmove", "king_in_check",
+                 "attack_bitboards")
+
+    def __init__(self, position):
+        ## Pairs of piece and toggled squares in the order they were applied
+        self.toggles = []
+        self.colour_to_move = position.colour_to_move
+        self.castle_rights = position.castle_rights
+        self.en_passant_side = position.en_passant_side
+        self.en_passant_target = position.en_passant_target
+        self.material = position.material
+        self.halfmove_clock = position.halfmove_clock
+        self.halfmove = position.halfmove
+        self.king_in_check = position.king_in_check.copy()
+        self.attack_bitboards = get_attack_bitboards(position)
 
 
 class Position():
@@ -48,112 +153,136 @@ class Position():
     all auxiliary information as well as piece locations
     """
 
-    def __init__(self, board = None, position_state = None):
+    def __init__(self, board = None):
 
         if board is None:
             self.board = Board()
         else:
             self.board = board
 
-        self.piece_map = dict()
-        self.set_initial_piece_locations()
-
         self.colour_to_move = Colour.WHITE
-        self.castle_rights = {Colour.WHITE : [1, 1], Colour.BLACK : [1, 1]}
+        ## Bit flags of the CastleRights of both colours
+        self.castle_rights = CastleRights.All
         self.halfmove_clock = 0
         self.halfmove = 2
         self.en_passant_target = None
         self.en_passant_side = Colour.WHITE
-        self.is_en_passant_capture = False
         self.king_in_check = [0, 0]
+        ## Undo records of the moves made, the most recent move last
+        self.undo_stack = []
+        ## Running material of white and black, counted once from the board and
+        ## then only changed by captures and promotions
+        material_sum = self.material_sum
+        self.material = (material_sum[Colour.WHITE], material_sum[Colour.BLACK])
+        ## Bound attack updaters indexed by piece, bound once here instead of
+        ## looked up on every changed piece of every move
+        self.attack_updaters = tuple((getattr(self, name), colour, arguments)
+                                     for name, colour, arguments in PIECE_ATTACK_UPDATERS)
+
+        self.white_pawn_moves = 0
+        self.white_pawn_attacks = 0
+        self.white_rook_attacks = 0
+        self.white_knight_attacks = 0
+        self.white_bishop_attacks = 0
+        self.white_queen_attacks = 0
+        self.white_king_attacks = 0
+
+        self.black_pawn_moves = 0
+        self.black_pawn_attacks = 0
+        self.black_rook_attacks = 0
+        self.black_knight_attacks = 0
+        self.black_bishop_attacks = 0
+        self.black_queen_attacks = 0
+        self.black_king_attacks = 0
+
+        self.white_attacked_squares = 0
+        self.black_attacked_squares = 0
+        ## The attack bitboards of all pieces are filled in once here, after
+        ## that make_move only updates those of the pieces a move affects
+        self.update_attack_bitboards(dict(enumerate(self.board.bb)))
 
-        self.white_pawn_moves = make_uint()
-        self.white_pawn_attacks = make_uint()
-        self.white_rook_attacks = make_uint()
-        self.white_knight_attacks = make_uint()
-        self.white_bishop_attacks = make_uint()
-        self.white_queen_attacks = make_uint()
-        self.white_king_attacks = make_uint()
-
-        self.black_pawn_moves = make_uint()
-        self.black_pawn_attacks = make_uint()
-        self.black_rook_attacks = make_uint()
-        self.black_knight_attacks = make_uint()
-        self.black_bishop_attacks = make_uint()
-        self.black_queen_attacks = make_uint()
-        self.black_king_attacks = make_uint()
-
-    def set_initial_piece_locations(self):
-        self.piece_map[Piece.wP] = set([i for i in range(8, 16)])
-        self.piece_map[Piece.wR] = {0, 7}
-        self.piece_map[Piece.wN] = {1, 6}
-        self.piece_map[Piece.wB] = {2, 5}
-        self.piece_map[Piece.wQ] = {3}
-        self.piece_map[Piece.wK] = {4}
-
-        self.piece_map[Piece.bP] = set([i for i in range(48, 56)])
-        self.piece_map[Piece.bR] = {56, 63}
-        self.piece_map[Piece.bN] = {57, 62}
-        self.piece_map[Piece.bB] = {58, 61}
-        self.piece_map[Piece.bQ] = {59}
-        self.piece_map[Piece.bK] = {60}
-
-    def reset_state_to(self, memento: PositionState) -> None:
-        """
-        Reset the position to a given memento
-        """
-        for key, value in memento.__dict__.items():
-            setattr(self, key, value)
+    @property
+    def piece_map(self) -> dict:
+        """
+        Return the squares of every piece as a dictionary of sets, derived from
+        the piece bitboards of the board
+        """
+        return {piece : set(bitboard_to_squares(bitboard)) for piece, bitboard in enumerate(self.board.bb)}
 
     @property
     def current_evaluation(self) -> float:
         """
-        Return the evaluation of the position instance
+        Return the evaluation of the position instance, the incrementally kept
+        material difference between white and black
         """
-        material_balance = self.material_sum()
-        white_material = material_balance[Colour.WHITE]
-        black_material = material_balance[Colour.BLACK]
+        return self.material_balance
 
-        return white_material - black_material
+    @property
+    def zobrist_key(self) -> int:
+        """
+        Return the Zobrist hash of the position, the incrementally maintained
+        key of the piece placement combined with the side to move, the castling
+        rights and the en passant file
+        """
+        zobrist_key = self.board.zobrist_key
+        if self.colour_to_move:
+            zobrist_key ^= ZOBRIST_SIDE
+        zobrist_key ^= ZOBRIST_CASTLE[self.castle_rights]
+        if self.en_passant_target is not None:
+            zobrist_key ^= ZOBRIST_EN_PASSANT[self.en_passant_target & 7]
+        return zobrist_key
 
     @property
     def material_sum(self) -> dict:
         """
         Returns a dictionary with the material value for black and white separately
         """
-        material_balance = {
-            Colour.WHITE : 0,
-            Colour.BLACK : 0
-        }
-
-        for key, value in self.piece_map.items():
-            if key in {Piece.bK, Piece.wK}:
-                continue
-            if key in Piece.black_pieces:
-                material_balance[Colour.BLACK] += len(value) * piece_to_value[key]
-            else:
-                material_balance[Colour.WHITE] += len(value) * piece_to_value[key]
-
-        return material_balance
-
-    @property
-    def occupied_squares_by_colour(self):
+        ## The number of pieces of a kind is the popcount of its bitboard
+        bitboards = self.board.bb
         return {
-            Colour.BLACK : self.board.black_pieces,
-            Colour.WHITE : self.board.white_pieces
+            Colour.WHITE : sum(bitboards[piece].bit_count() * value for piece, value in WHITE_VALUED_PIECES),
+            Colour.BLACK : sum(bitboards[piece].bit_count() * value for piece, value in BLACK_VALUED_PIECES)
         }
 
     @property
-    def black_attacked_squares(self):
-        return (self.black_rook_attacks | self.black_knight_attacks |
-                self.black_bishop_attacks | self.black_queen_attacks |
-                self.black_king_attacks | self.black_pawn_attacks)
+    def material_balance(self) -> int:
+        """
+        Returns the material value of white minus that of black
+        """
+        white_material, black_material = self.material
+        return white_material - black_material
 
-    @property
-    def white_attacked_squares(self):
-        return (self.white_rook_attacks | self.white_knight_attacks |
-                self.white_bishop_attacks | self.white_queen_attacks |
-                self.white_king_attacks | self.white_pawn_attacks)
+    def change_material(self, colour: int, value: int) -> None:
+        """
+        Add a value to the running material count of a colour
+        Parameters:
+            colour: the colour whose material changes
+            value: the value to add, negative for pieces that are lost
+        """
+        white_material, black_material = self.material
+        if colour == Colour.WHITE:
+            self.material = (white_material + value, black_material)
+        else:
+            self.material = (white_material, black_material + value)
+
+    ## The attacked squares of both colours are plain attributes, recomputed
+    ## only when the attack bitboards are updated after a move
+    def update_attacked_squares(self, colours: int = 3):
+        """
+        Recompute the squares attacked by the given colours from their attack
+        bitboards
+        Parameters:
+            colours: bit flags of the colours to recompute, the bit of a colour
+            is one shifted by its colour index
+        """
+        if colours & (1 << Colour.BLACK):
+            self.black_attacked_squares = (self.black_rook_attacks | self.black_knight_attacks |
+                                           self.black_bishop_attacks | self.black_queen_attacks |
+                                           self.black_king_attacks | self.black_pawn_attacks)
+        if colours & (1 << Colour.WHITE):
+            self.white_attacked_squares = (self.white_rook_attacks | self.white_knight_attacks |
+                                           self.white_bishop_attacks | self.white_queen_attacks |
+                                           self.white_king_attacks | self.white_pawn_attacks)
 
     ## -------------------------------- ##
     ## Routine to make a (legal) move   ##
@@ -165,33 +294,53 @@ class Position():
         legal move on the current state of the game
         """
 
-        original_position = PositionState(copy.deepcopy(self.__dict__))
+        if self.colour_to_move != move.colour:
+            return self.make_illegal_move_result("Not your turn to move!")
 
-        original_piece_map = copy.deepcopy(self.piece_map)
+        move_result = self.play_move(move)
+        if move_result.is_illegal_move:
+            return move_result
 
-        if not self.colour_to_move == move.colour:
-            return self.make_illegal_move_result("Not your turn to move!")
+        ## Colours are the ints 0 and 1, the other colour is one minus a colour
+        other_player = 1 - move.colour
+
+        if self.king_in_check[other_player] and not self.has_any_moves(other_player):
+            print("Checkmate")
+            return self.make_checkmate_result()
 
+        self.colour_to_move = 1 - self.colour_to_move
+        return move_result
+
+    def play_move(self, move: Move) -> MoveResult:
+        """
+        Play the given move if it is legal and does not leave the king of the
+        mover in check, without changing the colour to move or looking for a
+        checkmate. A played move is taken back with unmake_move
+        Returns:
+            an illegal move result if the move was not played
+        """
         if not self.is_legal_move(move):
             return self.make_illegal_move_result("This is not a valid move!")
 
+        ## Checking legality leaves the position untouched, the undo record is
+        ## only made for moves that are actually played
+        undo = UndoInfo(self)
+        self.undo_stack.append(undo)
+
         if move.is_capture:
             self.halfmove_clock = 0
             self.remove_opponent_piece(move.to_square)
 
-        if self.is_en_passant_capture:
+        if move.is_en_passant:
             if move.colour == Colour.WHITE:
                 self.remove_opponent_piece(move.to_square - 8)
             if move.colour == Colour.BLACK:
                 self.remove_opponent_piece(move.to_square + 8)
 
-        self.is_en_passant_capture = False
-
         if move.piece in {Piece.wP, Piece.bP}:
             self.halfmove_clock = 0
 
-        self.piece_map[move.piece].remove(move.from_square)
-        self.piece_map[move.piece].add(move.to_square)
+        self.toggle_piece(move.piece, move.from_bb | move.to_bb)
 
         if move.is_promotion:
             self.promote_pawn(move)
@@ -202,202 +351,177 @@ class Position():
         self.halfmove_clock += 1
         self.halfmove += 1
 
-        castle_rights = self.castle_rights[move.colour]
-
-        if castle_rights[0] or castle_rights[1]:
+        if self.castle_rights:
             self.adjust_castling_rights(move)
 
-        if self.en_passant_side != move.colour:
-            self.en_passant_target = None
-
-        ## Make a map of only the pieces that have changed position so we do not
-        ## need to update bitboards for every single piece, which is more efficient
-        change_map = {key : value for key, value in self.piece_map.items() if self.piece_map[key] != original_piece_map[key]}
-        self.board.update_position_bitboards(change_map)
+        ## A double push makes its skipped square the en passant target for the
+        ## next move only, any other move clears the target of the opponent
+        self.en_passant_target = self.get_en_passant_target(move)
+        if self.en_passant_target is not None:
+            self.en_passant_side = move.colour
+
+        ## Make a map of only the pieces that have changed position and the
+        ## pieces whose attacks run over a changed square so we do not need to
+        ## update bitboards for every single piece, which is more efficient.
+        ## The toggles recorded for the undo are exactly the pieces that moved
+        ## and the squares they changed, no diff of the bitboards is needed
+        bitboards = self.board.bb
+        change_map = {}
+        touched_squares = 0
+        touched_colours = 0
+        for piece, squares in undo.toggles:
+            change_map[piece] = bitboards[piece]
+            touched_squares |= squares
+            touched_colours |= 1 << (piece >= Piece.bP)
+        for piece in self.get_affected_pieces(touched_squares, touched_colours):
+            change_map[piece] = bitboards[piece]
         self.update_attack_bitboards(change_map)
 
         self.evaluate_king_check()
 
         if self.king_in_check[move.colour]:
-            self.reset_state_to(original_position)
+            self.unmake_move()
             return self.make_illegal_move_result("Your own king is in check")
-
-        other_player = not move.colour
-
-        if self.king_in_check[other_player] and not self.has_any_moves(other_player):
-            print("Checkmate")
-            return self.make_checkmate_result()
-
-        self.colour_to_move = not self.colour_to_move
         return self.make_move_result()
 
-    ## ------------------------------------------------ ##
-    ## Check whether the player has any possible moves  ##
-    ## ------------------------------------------------ ##
-    def has_any_moves(self, colour_to_move):
+    def toggle_piece(self, piece, squares):
         """
-        Returns true if any moves are possible
-        """
-        if self.has_king_move(colour_to_move):
-            return True
-        if self.has_queen_move(colour_to_move):
-            return True
-        if self.has_rook_move(colour_to_move):
-            return True
-        if self.has_knight_move(colour_to_move):
-            return True
-        if self.has_bishop_move(colour_to_move):
-            return True
-        if self.has_pawn_move(colour_to_move):
-            return True
-
-        return False
-
-    def has_king_move(self, colour_to_move) -> bool:
-        """
-        Return True if there is a legal king move for the given colour in the
-        current Position State
+        Toggle the given squares of a piece on the board and record the toggle
+        in the undo record of the move being made
+        Parameters:
+            piece: the piece to add to or remove from the squares
+            squares: bitboard of the squares to toggle
         """
-        king_colour_map = {
-            Colour.WHITE : (self.white_king_attacks, Piece.wK),
-            Colour.BLACK : (self.black_king_attacks, Piece.bK),
-        }
-        attacked_squares = {
-            Colour.WHITE : self.white_attacked_squares,
-            Colour.BLACK : self.black_attacked_squares
-        }
-
-        king_attacks = king_colour_map[colour_to_move][0] & ~attacked_squares[not colour_to_move]
-        king_piece = king_colour_map[colour_to_move][1]
-
-        if not king_attacks.any():
-            return False
+        self.board.toggle_piece(piece, squares)
+        self.undo_stack[-1].toggles.append((piece, squares))
 
-        from_square = self.piece_map[king_piece].copy()
-        king_squares = bitboard_to_squares(king_attacks)
-
-        for to_square in king_squares:
-            if self.is_legal_king_move(Move(king_piece, (from_square, to_square))):
-                return True
-        return False
-
-    def has_queen_move(self, colour_to_move) -> bool:
+    def unmake_move(self) -> None:
         """
-        Return True if there is a legal queen move for the given colour in the
-        current Position State
+        Take back the most recently made move by restoring the state recorded
+        in its undo record
         """
-        queen_colour_map = {
-            Colour.WHITE : (self.white_queen_attacks, Piece.wQ),
-            Colour.BLACK : (self.black_queen_attacks, Piece.bQ)
-        }
-        queen_attacks = queen_colour_map[colour_to_move][0]
-        queen_piece = queen_colour_map[colour_to_move][1]
+        undo = self.undo_stack.pop()
 
-        if not queen_attacks.any():
-            return False
+        ## A toggle is its own inverse, applying them again in reverse order
+        ## restores the pieces, the mailbox, the occupancies and the key
+        toggle_piece = self.board.toggle_piece
+        for piece, squares in reversed(undo.toggles):
+            toggle_piece(piece, squares)
 
-        from_squares = self.piece_map[queen_piece]
-        to_squares = bitboard_to_squares(queen_attacks)
-        for from_square in list(from_squares):
-            for to_square in to_squares:
-                if self.is_legal_queen_move(Move(queen_piece, (from_square, to_square))):
-                    return True
-        return False
+        self.colour_to_move = undo.colour_to_move
+        self.castle_rights = undo.castle_rights
+        self.en_passant_side = undo.en_passant_side
+        self.en_passant_target = undo.en_passant_target
+        self.material = undo.material
+        self.halfmove_clock = undo.halfmove_clock
+        self.halfmove = undo.halfmove
+        self.king_in_check = undo.king_in_check
+        ## The attack bitboards are plain instance attributes, one update of
+        ## the instance dictionary restores them all
+        self.__dict__.update(zip(ATTACK_BITBOARDS, undo.attack_bitboards))
 
-    def has_knight_move(self, colour_to_move) -> bool:
+    ## ------------------------------------------------ ##
+    ## Check whether the player has any possible moves  ##
+    ## ------------------------------------------------ ##
+    def has_any_moves(self, colour_to_move):
         """
-        Return True if there is a legal knight move for the given colour in the
-        current Position State
+        Returns true if any legal moves are possible, also when the colour is
+        not in check
         """
-        knight_colour_map = {
-            Colour.WHITE : (self.white_knight_attacks, Piece.wN),
-            Colour.BLACK : (self.black_knight_attacks, Piece.bN)
-        }
-
-        knight_attacks = knight_colour_map[colour_to_move][0]
-        knight_piece = knight_colour_map[colour_to_move][1]
-
-        if not knight_attacks.any():
-            return False
-
-        from_squares = self.piece_map[knight_piece]
-        to_squares = bitboard_to_squares(knight_attacks)
-        for from_square in list(from_squares):
-            for to_square in to_squares:
-                if self.is_legal_knight_move(Move(knight_piece, (from_square, to_square))):
-                    return True
+        for piece in MOVE_PROBE_ORDER[colour_to_move]:
+            if self.has_piece_move(piece, colour_to_move):
+                return True
         return False
 
-    def has_bishop_move(self, colour_to_move) -> bool:
+    def has_piece_move(self, piece: int, colour_to_move) -> bool:
         """
-        Return True if there is a legal bishop move for the given colour in the
-        current Position State
+        Return True if there is a legal move for the given piece of the given
+        colour in the current Position State
+        Parameters:
+            piece: the piece to find a legal move for
+            colour_to_move: the colour the piece belongs to
         """
-        bishop_colour_map = {
-            Colour.WHITE : (self.white_bishop_attacks, Piece.wB),
-            Colour.BLACK : (self.black_bishop_attacks, Piece.bB)
-        }
-
-        bishop_attacks = bishop_colour_map[colour_to_move][0]
-        bishop_piece = bishop_colour_map[colour_to_move][1]
-
-        if not bishop_attacks.any():
+        pieces = self.board.bb[piece]
+        if not pieces:
             return False
 
-        from_squares = self.piece_map[bishop_piece]
-        to_squares = bitboard_to_squares(bishop_attacks)
-        for from_square in list(from_squares):
-            for to_square in to_squares:
-                if self.is_legal_bishop_move(Move(bishop_piece, (from_square, to_square))):
-                    return True
-        return False
-
-    def has_rook_move(self, colour_to_move) -> bool:
-        """
-        Return True if there is a legal rook move for the given colour in the
-        current Position State
-        """
-        rook_colour_map = {
-            Colour.WHITE : (self.white_rook_attacks, Piece.wR),
-            Colour.BLACK : (self.black_rook_attacks, Piece.bR)
-        }
+        ## Select the state of both sides with a single branch on the colour
+        if colour_to_move:
+            own_pieces, pawn_moves, enemy_attacks = \
+                self.board.black_pieces, self.black_pawn_moves, self.white_attacked_squares
+        else:
+            own_pieces, pawn_moves, enemy_attacks = \
+                self.board.white_pieces, self.white_pawn_moves, self.black_attacked_squares
 
-        rook_attacks = rook_colour_map[colour_to_move][0]
-        rook_piece = rook_colour_map[colour_to_move][1]
+        ## Only squares not taken by own pieces can be targets of a legal move
+        attacks = getattr(self, PIECE_ATTACK_BITBOARDS[piece]) & ~own_pieces
+        if piece == Piece.wP or piece == Piece.bP:
+            attacks |= pawn_moves
+        elif piece == Piece.wK or piece == Piece.bK:
+            attacks &= ~enemy_attacks
 
-        if not rook_attacks.any():
+        if not attacks:
             return False
 
-        from_squares = self.piece_map[rook_piece]
-        to_squares = bitboard_to_squares(rook_attacks)
-        for from_square in list(from_squares):
-            for to_square in to_squares:
-                if self.is_legal_rook_move(Move(rook_piece, (from_square, to_square))):
-                    return True
-        return False
+        ## A side in check can only play the moves that end the check and the
+        ## attacks of the opponent leave out the pieces it defends, so these
+        ## targets are only legal once the move has been played and taken back
+        if piece in (Piece.wK, Piece.bK) or self.king_in_check[colour_to_move]:
+            return self.has_played_move(piece, pieces, attacks)
+
+        ## Only pieces on a line through their own king can be pinned to it,
+        ## and a pawn taking en passant also takes a pawn off the board next
+        ## to it, the moves of these pieces are played and taken back as well
+        board = self.board
+        king_square = board.bb[Piece.bK if colour_to_move else Piece.wK].bit_length() - 1
+        pinnable = pieces & QUEEN_ATTACKS[king_square]
+        enemy_pieces = board.occupied_squares ^ own_pieces
+        if self.en_passant_target is not None and piece in (Piece.wP, Piece.bP):
+            enemy_pieces |= SQUARE_BB[self.en_passant_target]
+            pawn_attackers = BLACK_PAWN_ATTACKS if colour_to_move == Colour.WHITE else WHITE_PAWN_ATTACKS
+            pinnable |= pieces & pawn_attackers[self.en_passant_target]
+        free_pieces = pieces ^ pinnable
+
+        ## Any target of the other pieces is a legal move, they are checked for
+        ## all of them at once which needs no Move objects at all
+        if free_pieces:
+            if piece in (Piece.wN, Piece.bN):
+                free_targets = knight_set_attacks(free_pieces) & ~own_pieces
+            elif piece == Piece.wP:
+                free_targets = (white_pawn_set_pushes(free_pieces, board.empty_squares) |
+                                 white_pawn_set_attacks(free_pieces) & enemy_pieces)
+            elif piece == Piece.bP:
+                free_targets = (black_pawn_set_pushes(free_pieces, board.empty_squares) |
+                                 black_pawn_set_attacks(free_pieces) & enemy_pieces)
+            else:
+                ## Sliding pieces are stopped at the first blocker
+                free_targets = any_slider_attack(free_pieces, PIECE_SLIDER_ATTACKS[piece],
+                                                  board.occupied_squares, ~own_pieces)
+            if free_targets:
+                return True
+        return bool(pinnable) and self.has_played_move(piece, pinnable, attacks)
 
-    def has_pawn_move(self, colour_to_move) -> bool:
+    def has_played_move(self, piece: int, pieces: int, targets: int) -> bool:
         """
-        Return True if there is a legal pawn move for the given colour in the
-        current Position State
-        """
-        pawn_colour_map = {
-            Colour.WHITE : (self.white_pawn_attacks | self.white_pawn_moves, Piece.wP),
-            Colour.BLACK : (self.black_pawn_attacks | self.black_pawn_moves, Piece.bP)
-        }
-
-        pawn_attacks = pawn_colour_map[colour_to_move][0]
-        pawn_piece = pawn_colour_map[colour_to_move][1]
-
-        if not pawn_attacks.any():
-            return False
-
-        from_squares = self.piece_map[pawn_piece]
-        to_squares = bitboard_to_squares(pawn_attacks)
-        for from_square in list(from_squares):
-            for to_square in to_squares:
-                if self.is_legal_pawn_move(Move(pawn_piece, (from_square, to_square))):
+        Return True if a move of any of the given pieces to any of the target
+        squares can be played without leaving the own king in check, every
+        candidate is played and taken back again
+        Parameters:
+            piece: the piece to find a legal move for
+            pieces: bitboard of the squares of the pieces to move
+            targets: bitboard of the candidate target squares
+        """
+        while pieces:
+            from_bb = pieces & -pieces
+            from_square = from_bb.bit_length() - 1
+            squares = targets
+            while squares:
+                to_bb = squares & -squares
+                if not self.play_move(Move(piece, (from_square, to_bb.bit_length() - 1))).is_illegal_move:
+                    self.unmake_move()
                     return True
+                squares ^= to_bb
+            pieces ^= from_bb
         return False
 
     def is_legal_move(self, move: Move) -> bool:
@@ -406,6 +530,8 @@ class Position():
         the game. Return True if and only if the move is legal.
         """
         piece = move.piece
+        if piece is None:
+            return False
 
         if self.is_capture(move):
             move.is_capture = True
@@ -422,75 +548,49 @@ class Position():
                 return True
 
             ## Handling en passant moves for pawns
-            en_passant_target = self.get_en_passant_target(move)
-            if en_passant_target:
-                self.en_passant_side = move.colour
-                self.en_passant_target = int(en_passant_target)
             if move.to_square == self.en_passant_target:
-                self.is_en_passant_capture = True
+                move.is_en_passant = True
 
             return True
 
-        if piece in (Piece.wN, Piece.bN):
-            return self.is_legal_knight_move(move)
-        if piece in (Piece.wR, Piece.bR):
-            return self.is_legal_rook_move(move)
-        if piece in (Piece.wB, Piece.bB):
-            return self.is_legal_bishop_move(move)
-        if piece in (Piece.wQ, Piece.bQ):
-            return self.is_legal_queen_move(move)
-        if piece in (Piece.wK, Piece.bK):
-            legal_king_move = self.is_legal_king_move(move)
-            if not legal_king_move:
-                return False
-            if self.is_castling(move):
-                move.is_castling = True
-            return True
+        if not self.is_legal_piece_move(move):
+            return False
+        if piece in (Piece.wK, Piece.bK) and self.is_castling(move):
+            move.is_castling = True
+        return True
 
     def is_capture(self, move: Move) -> bool:
         """
         Check whether a move is capturing another piece in the current
         Position State of the game.
         """
-        to_square = set_bit(make_uint(), move.to_square)
-
         if move.colour == Colour.WHITE:
-            intersects = to_square & self.board.black_pieces
-            if intersects:
-                return True
-        if move.colour == Colour.BLACK:
-            intersects = to_square & self.board.white_pieces
-            if intersects:
-                return True
-        return False
+            return bool(move.to_bb & self.board.black_pieces)
+        return bool(move.to_bb & self.board.white_pieces)
 
     def is_promotion(self, pawn_move: Move) -> bool:
         """
         Check whether a pawn move leads to promotion.
         """
-        if pawn_move.colour == Colour.WHITE and pawn_move.to_square in Rank.x8:
-            return True
-        if pawn_move.colour == Colour.BLACK and pawn_move.to_square in Rank.x1:
-            return True
-        return False
+        if pawn_move.colour == Colour.WHITE:
+            return bool(pawn_move.to_bb & RANK_8)
+        return bool(pawn_move.to_bb & RANK_1)
 
     def is_castling(self, move: Move) -> bool:
         if move.from_square == Square.E1:
-            if move.to_square in {Square.G1, Square.C1}:
-                return True
+            return bool(move.to_bb & WHITE_CASTLE_TARGETS)
         if move.from_square == Square.E8:
-            if move.to_square in {Square.G8, Square.C8}:
-                return True
+            return bool(move.to_bb & BLACK_CASTLE_TARGETS)
         return False
 
     def get_en_passant_target(self, move: Move):
-        if move.piece not in {Piece.wP, Piece.bP}:
+        if move.piece != Piece.wP and move.piece != Piece.bP:
             return None
         if move.colour == Colour.WHITE:
-            if move.to_square in Rank.x4 and move.from_square in Rank.x2:
+            if move.to_bb & RANK_4 and move.from_bb & RANK_2:
                 return move.to_square - 8
         if move.colour == Colour.BLACK:
-            if move.to_square in Rank.x5 and move.from_square in Rank.x7:
+            if move.to_bb & RANK_5 and move.from_bb & RANK_7:
                 return move.to_square + 8
 
     ## ---------------------------- ##
@@ -502,237 +602,62 @@ class Position():
         """
         Returns True if and only if the given pawn move is fully legal
         """
-        from_bitboard = set_bit(make_uint(), move.from_square)
-        to_bitboard = set_bit(make_uint(), move.to_square)
-        en_passant_target = make_uint()
+        board = self.board
+        ## Check if the selected from square is actually a pawn of the mover
+        if not (board.bb[move.piece] & move.from_bb):
+            return False
 
-        if self.en_passant_target:
-            en_passant_target = set_bit(make_uint(), self.en_passant_target)
+        en_passant_target = 0
+        if self.en_passant_target is not None:
+            en_passant_target = SQUARE_BB[self.en_passant_target]
 
+        ## A push needs an empty target square, a double push also needs the
+        ## square it passes over to be empty, a capture needs an opponent piece
+        ## or the en passant target on the attacked square
         if move.piece == Piece.wP:
-            ## Check if the selected from square is actually a pawn
-            if not (self.board.white_pawn & from_bitboard):
-                return False
-            ## Cehck that the move is compliant with pawn movement patterns
-            if self.is_not_pawn_move(move):
-                return False
-            ## If forwards pawnmotion, check it is not blocked by another piece
-            if move.from_square == move.to_square - 8 and (to_bitboard & self.board.occupied_squares):
-                return False
-            ## If pawncapture movement, check it intersects with black pieces or
-            ## the en passant target
-            if move.from_square == move.to_square - 9 or move.from_square == move.to_square - 7:
-                if (self.white_pawn_attacks & to_bitboard) & ~(self.board.black_pieces | en_passant_target):
-                    return False
-            return True
-
-        if move.piece == Piece.bP:
-            ## Check if the selected from square is actually a pawn
-            if not (self.board.black_pawn & from_bitboard):
-                return False
-            ## Cehck that the move is compliant with pawn movement patterns
-            if self.is_not_pawn_move(move):
-                return False
-            ## If forwards pawnmotion, check it is not blocked by another piece
-            if move.from_square == move.to_square + 8 and (to_bitboard & self.board.occupied_squares):
-                return False
-            ## If pawncapture movement, check it intersects with white pieces or
-            ## the en passant target
-            if move.from_square == move.to_square + 9 or move.from_square == move.to_square + 7:
-                if (self.black_pawn_attacks & to_bitboard) & ~(self.board.white_pieces | en_passant_target):
-                    return False
-            return True
-
-        return False
-
-    ## Knight moves
-    def is_legal_knight_move(self, move: Move) -> bool:
-        """
-        Returns True if and only if the proposed knight move is fully legal
-        """
-        from_bitboard = set_bit(make_uint(), move.from_square)
-        if move.piece == Piece.wN:
-            if not (self.board.white_knight & from_bitboard):
-                return False
-            if self.is_not_knight_attack(move):
-                return False
-            return True
-
-        if move.piece == Piece.bN:
-            if not (self.board.black_knight & from_bitboard):
-                return False
-            if self.is_not_knight_attack(move):
-                return False
-            return True
-
-        return False
-
-    ## Rook moves
-    def is_legal_rook_move(self, move: Move) -> bool:
-        """
-        Returns True if and only if the proposed rook move obeys the rules
-        for rook movement
-        """
-        from_bitboard = set_bit(make_uint(), move.from_square)
-        if move.piece == Piece.wR:
-            if not (self.board.white_rook & from_bitboard):
-                return False
-            if self.is_not_rook_attack(move):
-                return False
-            return True
-
-        if move.piece == Piece.bR:
-            if not (self.board.black_rook & from_bitboard):
-                return False
-            if self.is_not_rook_attack(move):
-                return False
-            return True
-
-        return False
-
-    ## Bishop moves
-    def is_legal_bishop_move(self, move: Move) -> bool:
-        """
-        Return True if and only if the proposed move is a valid bishop move
-        """
-        from_bitboard = set_bit(make_uint(), move.from_square)
-        if move.piece == Piece.wB:
-            if not (self.board.white_bishop & from_bitboard):
-                return False
-            if self.is_not_bishop_attack(move):
-                return False
-            return True
-
-        if move.piece == Piece.bB:
-            if not (self.board.black_bishop & from_bitboard):
-                return False
-            if self.is_not_bishop_attack(move):
-                return False
-            return True
-
-        return False
-
-    ## Queen moves
-    def is_legal_queen_move(self, move: Move) -> bool:
-        """
-        Return True if and only if the proposed move obeys queen movement patterns
-        """
-        from_bitboard = set_bit(make_uint(), move.from_square)
-        if move.piece == Piece.wQ:
-            if not(self.board.white_queen & from_bitboard):
-                return False
-            if self.is_not_queen_attack(move):
-                return False
-            return True
-
-        if move.piece == Piece.bQ:
-            if not (self.board.black_queen & from_bitboard):
-                return False
-            if self.is_not_queen_attack(move):
-                return False
-            return True
+            pushes = white_pawn_set_pushes(move.from_bb, board.empty_squares)
+            captures = WHITE_PAWN_ATTACKS[move.from_square] & (board.black_pieces | en_passant_target)
+        elif move.piece == Piece.bP:
+            pushes = black_pawn_set_pushes(move.from_bb, board.empty_squares)
+            captures = BLACK_PAWN_ATTACKS[move.from_square] & (board.white_pieces | en_passant_target)
+        else:
+            return False
 
-        return False
+        return bool(move.to_bb & (pushes | captures))
 
-    ## King moves
-    def is_legal_king_move(self, move: Move) -> bool:
+    ## Knights, rooks, bishops, queens and kings
+    def is_legal_piece_move(self, move: Move) -> bool:
         """
-        Returns True if and only if the proposed move is a valid king move
+        Returns True if and only if the proposed move of a piece other than a
+        pawn obeys the movement pattern of that piece
         """
-        from_bitboard = set_bit(make_uint(), move.from_square)
-        if move.piece == Piece.wK:
-            if not(self.board.white_king & from_bitboard):
-                return False
-            if self.is_not_king_attack(move):
-                return False
-            return True
-
-        if move.piece == Piece.bK:
-            if not (self.board.black_king & from_bitboard):
-                return False
-            if self.is_not_king_attack(move):
-                return False
-            return True
-
-        return False
-
-    ## ---------------------------- ##
-    ## Piece move legality helpers  ##
-    ## ---------------------------- ##
-
-    ## Pawns
-    def is_not_pawn_move(self, move: Move) -> bool:
-        to_bitboard = set_bit(make_uint(), move.to_square)
-        if move.colour == Colour.WHITE:
-            if not (self.board.white_pawn_move[move.from_square] |
-                    self.board.white_pawn_attack[move.from_square]) & to_bitboard:
-                return True
+        if not (self.board.bb[move.piece] & move.from_bb):
             return False
-        if move.colour == Colour.BLACK:
-            if not (self.board.black_pawn_move[move.from_square] |
-                    self.board.black_pawn_attack[move.from_square]) & to_bitboard:
-                return True
+        ## A piece can never move onto a square taken by its own side
+        own_pieces = self.board.black_pieces if move.colour else self.board.white_pieces
+        if move.to_bb & own_pieces:
             return False
-
-    ## Knights
-    def is_not_knight_attack(self, move: Move) -> bool:
-        to_bitboard = set_bit(make_uint(), move.to_square)
-        if move.colour == Colour.WHITE:
-            if not (self.board.knight_attacks[move.from_square] & to_bitboard):
-                return True
-            return False
-        if move.colour == Colour.BLACK:
-            if not (self.board.knight_attacks[move.from_square] & to_bitboard):
-                return True
+        if self.is_not_attack(move):
             return False
+        return True
 
-    ## Rooks
-    def is_not_rook_attack(self, move: Move) -> bool:
-        to_bitboard = set_bit(make_uint(), move.to_square)
-        if move.colour == Colour.WHITE:
-            if not (self.board.rook_attacks[move.from_square] & to_bitboard):
-                return True
-            return False
-        if move.colour == Colour.BLACK:
-            if not (self.board.rook_attacks[move.from_square] & to_bitboard):
-                return True
-            return False
-
-    ## Bishops
-    def is_not_bishop_attack(self, move: Move) -> bool:
-        to_bitboard = set_bit(make_uint(), move.to_square)
-        if move.colour == Colour.WHITE:
-            if not (self.board.bishop_attacks[move.from_square] & to_bitboard):
-                return True
-            return False
-        if move.colour == Colour.BLACK:
-            if not (self.board.bishop_attacks[move.from_square] & to_bitboard):
-                return True
-            return False
-
-    ## Queens
-    def is_not_queen_attack(self, move: Move) -> bool:
-        to_bitboard = set_bit(make_uint(), move.to_square)
-        if move.colour == Colour.WHITE:
-            if not (self.board.queen_attacks[move.from_square] & to_bitboard):
-                return True
-            return False
-        if move.colour == Colour.BLACK:
-            if not (self.board.queen_attacks[move.from_square] & to_bitboard):
-                return True
-            return False
+    ## ---------------------------- ##
+    ## Piece move legality helpers  ##
+    ## ---------------------------- ##
 
-    ## Kings
-    def is_not_king_attack(self, move: Move) -> bool:
-        to_bitboard = set_bit(make_uint(), move.to_square)
-        if move.colour == Colour.WHITE:
-            if not (self.board.king_attacks[move.from_square] & to_bitboard):
-                return True
-            return False
-        if move.colour == Colour.BLACK:
-            if not (self.board.king_attacks[move.from_square] & to_bitboard):
-                return True
+    ## Knights, rooks, bishops, queens and kings
+    def is_not_attack(self, move: Move) -> bool:
+        if not (PIECE_ATTACK_TABLES[move.piece][move.from_square] & move.to_bb):
+            ## The castling squares are the only king moves outside the
+            ## attacks of the king
+            if move.piece == Piece.wK or move.piece == Piece.bK:
+                return not (move.to_bb & self.castle_king_moves(move.colour))
+            return True
+        ## Sliding pieces can not jump over the pieces in their way, the target
+        ## is on one of their lines so only the squares in between can block
+        if PIECE_SLIDER_ATTACKS[move.piece] is None:
             return False
+        return bool(BETWEEN_SQUARES[move.from_square][move.to_square] & self.board.occupied_squares)
 
     def make_illegal_move_result(self, message: str) -> MoveResult:
         """
@@ -741,7 +666,7 @@ class Position():
         move_result = MoveResult()
         move_result.is_illegal_move = True
         move_result.fen = None
-        print(message)
+        move_result.message = message
         return move_result
 
     def make_move_result(self) -> MoveResult:
@@ -764,385 +689,222 @@ class Position():
     def remove_opponent_piece(self, to_square):
         """
         Remove a piece from the opponent in a capturing move
+        Returns:
+            the piece that was removed, None if the square was empty
         """
-        target = None
-
-        for key, value in self.piece_map.items():
-            if to_square in value:
-                target = key
-                break
-        self.piece_map[target].remove(to_square)
+        piece = self.board.mailbox[to_square]
+        if piece is not None:
+            self.toggle_piece(piece, SQUARE_BB[to_square])
+            self.change_material(int(piece >= Piece.bP), -piece_to_value[piece])
+        return piece
 
     def promote_pawn(self, move):
         """
-        Promote a pawn after it has crossed the board
+        Promote a pawn after it has crossed the board to the piece kind given
+        by move.promote_to, a queen when the move does not name one. Callers
+        that do not go through the user interface must set it themselves
+        Returns:
+            the piece the pawn was promoted to
         """
-        while True:
-            promotion_piece = input("Choose promotion piece")
-            promotion_piece = promotion_piece.lower()
-            legal_piece = user_promotion_input.get(promotion_piece)
-            if not legal_piece:
-                print("Please choose a legal promotion")
-                continue
-            self.piece_map[move.piece].remove(move.to_square)
-            new_piece = self.get_promotion_piece_type(legal_piece, move)
-            self.piece_map[new_piece].add(move.to_square)
-            break
+        legal_piece = move.promote_to
+        if legal_piece is None:
+            legal_piece = Piece.QUEEN
+        new_piece = self.get_promotion_piece_type(legal_piece, move)
+        self.toggle_piece(move.piece, move.to_bb)
+        self.toggle_piece(new_piece, move.to_bb)
+        self.change_material(move.colour, piece_to_value[new_piece] - piece_to_value[move.piece])
+        return new_piece
 
     def get_promotion_piece_type(self, legal_piece, move: Move):
-        if move.colour == Colour.WHITE:
-            return white_promotion_map[legal_piece]
-        if move.colour == Colour.BLACK:
-            return black_promotion_map[legal_piece]
+        return PROMOTION_MAPS[move.colour][legal_piece]
 
     def get_piece_on_square(self, from_square: int):
-        for key, value in self.piece_map.items():
-            for square in value:
-                if square == from_square:
-                    return key
-        return None
+        return self.board.mailbox[from_square]
 
     def move_rooks_for_castling(self, move: Move):
         """
         Perform a castling move given the side that is playing
+        Returns:
+            the rook piece that was moved
         """
-        rook_colour_map = {
-            Colour.WHITE : Piece.wR,
-            Colour.BLACK : Piece.bR
-        }
-
-        square_map = {
-            Square.G1 : (Square.H1, Square.F1),
-            Square.C1 : (Square.A1, Square.D1),
-            Square.G8 : (Square.H8, Square.F8),
-            Square.C8 : (Square.A8, Square.D8),
-        }
-
-        self.piece_map[rook_colour_map[move.colour]].remove(square_map[move.to_square][0])
-        self.piece_map[rook_colour_map[move.colour]].add(square_map[move.to_square][1])
+        rook = CASTLE_ROOKS[move.colour]
+        self.toggle_piece(rook, CASTLE_ROOK_TOGGLES[move.to_square])
+        return rook
 
     def adjust_castling_rights(self, move: Move):
         """
-        Adjust the castling rights after a castling move is performed or when
-        given rooks are moved
-        """
-        if move.piece in {Piece.wK, Piece.bK, Piece.wR, Piece.bR}:
-            if move.piece == Piece.wK:
-                self.castle_rights[Colour.WHITE] = [0, 0]
-            if move.piece == Piece.bK:
-                self.castle_rights[Colour.BLACK] == [0, 0]
-
-            if move.piece == Piece.wR:
-                if move.from_square == Square.H1:
-                    self.castle_rights[Colour.WHITE][0] = 0
-                if move.from_square == Square.A1:
-                    self.castle_rights[Colour.WHITE][1] = 0
-            if move.piece == Piece.bR:
-                if move.from_square == Square.H8:
-                    self.castle_rights[Colour.BLACK][0] = 0
-                if move.from_square == Square.A8:
-                    self.castle_rights[Colour.BLACK][1] = 0
-
-    def update_attack_bitboards(self, change_map):
-        """
-        Update all attack bitboards that have changed after the
-        move has been executed
+        Adjust the castling rights after a castling move is performed, when
+        given rooks are moved or when they are captured
         """
-        for piece, squares in change_map.items():
-            ## Pawns
-            if piece == Piece.wP:
-                for square in squares:
-                    self.white_pawn_attacks = make_uint()
-                    self.white_pawn_moves = make_uint()
-                    self.update_legal_pawn_moves(square, Colour.WHITE)
-            if piece == Piece.bP:
-                for square in squares:
-                    self.black_pawn_attacks = make_uint()
-                    self.black_pawn_moves = make_uint()
-                    self.update_legal_pawn_moves(square, Colour.BLACK)
-
-            ## Rooks
-            if piece == Piece.wR:
-                for square in squares:
-                    self.white_rook_attacks = make_uint()
-                    self.update_legal_rook_moves(square, Colour.WHITE)
-            if piece == Piece.bR:
-                for square in squares:
-                    self.black_rook_attacks = make_uint()
-                    self.update_legal_rook_moves(square, Colour.BLACK)
-
-            ## Knights
-            if piece == Piece.wN:
-                for square in squares:
-                    self.white_knight_attacks = make_uint()
-                    self.update_legal_knight_moves(square, Colour.WHITE)
-            if piece == Piece.bN:
-                for square in squares:
-                    self.black_knight_attacks = make_uint()
-                    self.update_legal_knight_moves(square, Colour.BLACK)
-
-            ## Bishops
-            if piece == Piece.wB:
-                for square in squares:
-                    self.white_bishop_attacks = make_uint()
-                    self.update_legal_bishop_moves(square, Colour.WHITE)
-            if piece == Piece.bB:
-                for square in squares:
-                    self.black_bishop_attacks = make_uint()
-                    self.update_legal_bishop_moves(square, Colour.BLACK)
-
-            ## Queens
-            if piece == Piece.wQ:
-                for square in squares:
-                    self.white_queen_attacks = make_uint()
-                    self.update_legal_queen_moves(square, Colour.WHITE)
-            if piece == Piece.bQ:
-                for square in squares:
-                    self.black_queen_attacks = make_uint()
-                    self.update_legal_queen_moves(square, Colour.BLACK)
-
-            ## Kings
-            if piece == Piece.wK:
-                for square in squares:
-                    self.white_king_attacks = make_uint()
-                    self.update_legal_king_moves(square, Colour.WHITE)
-            if piece == Piece.bK:
-                for square in squares:
-                    self.black_king_attacks = make_uint()
-                    self.update_legal_king_moves(square, Colour.BLACK)
+        ## A king or rook leaving its starting square and a capture on a rook
+        ## starting square both give up the rights bound to that square
+        self.castle_rights &= (CASTLE_RIGHTS_MASKS[move.from_square] &
+                               CASTLE_RIGHTS_MASKS[move.to_square])
 
-## ---------------------------- ##
-## Updating legal pawn moves    ##
-## ---------------------------- ##
-    def update_legal_pawn_moves(self, from_square: np.uint64, colour_to_move: int):
+    def get_affected_pieces(self, touched_squares: int, touched_colours: int = 3) -> list:
         """
-        Update the pseudo-legal Pawn moves:
-            - Pawn non-attacks that do not intersect with any occupied squares
-            - Pawn attacks that intersect with opponent pieces
+        Find the pieces whose attack bitboards depend on the occupancy of the
+        given squares, i.e. whose attacks have to be updated when any of them
+        changed after a move
         Parameters:
-            from_square: the proposed square from which the pawn is moving
-            colour_to_move: current colour to move
-        """
-        bitboard = make_uint()
-
-        self.white_pawn_attacks = self.board.white_pawn_attacks
-        self.black_pawn_attacks = self.board.black_pawn_attacks
-
-        legal_motion = {
-            Colour.WHITE : self.board.white_pawn_move[from_square],
-            Colour.BLACK : self.board.black_pawn_move[from_square]
-        }
-
-        legal_motion[colour_to_move] &= self.board.empty_squares
-
-        legal_attacks = {
-            Colour.WHITE : self.board.white_pawn_attack[from_square],
-            Colour.BLACK : self.board.black_pawn_attack[from_square]
-        }
-
-        ## Handling en-passant for the pawns
-        if self.en_passant_target:
-            en_passant = set_bit(bitboard, self.en_passant_target)
-            en_passant_move = legal_attacks[colour_to_move] & en_passant
-            if en_passant_move:
-                legal_attacks[colour_to_move] |= en_passant_move
-
-        legal_moves = legal_motion[colour_to_move] & legal_attacks[colour_to_move]
-
-        ## Remove own piece targets
-        occupied_squares = {
-            Colour.WHITE : self.board.white_pieces,
-            Colour.BLACK : self.board.black_pieces
-        }
-
-        own_piece_targets = occupied_squares[colour_to_move]
-
-        if own_piece_targets:
-            legal_moves &= ~own_piece_targets
-
-        if colour_to_move == Colour.WHITE:
-            self.white_pawn_attacks = legal_attacks[Colour.WHITE]
-            self.white_pawn_moves = legal_motion[Colour.WHITE]
-        if colour_to_move == Colour.BLACK:
-            self.black_pawn_attacks = legal_attacks[Colour.BLACK]
-            self.black_pawn_moves = legal_motion[Colour.BLACK]
-
-## ---------------------------- ##
-## Updating legal rook moves    ##
-## ---------------------------- ##
-    def update_legal_rook_moves(self, from_square: np.uint64, colour_to_move: int) -> np.uint64:
-        """
-        Update the pseudo-legal sliding-piece moves for rank and file direction
-        by getting the first blocker in each relevant direction using a bitscan.
-        Parameters:
-            from_square: the proposed square from which the rook is moving
-            colour_to_move: current colour to move
+            touched_squares: bitboard of the squares whose occupancy changed
+            touched_colours: bit flags of the colours that had a piece toggled,
+            the bit of a colour is one shifted by its colour index
+        Returns:
+            list of the affected pieces
         """
-        bitboard = make_uint()
+        bitboards = self.board.bb
         occupied = self.board.occupied_squares
+        ## Knights and kings only exclude the squares of their own side from
+        ## their attacks, they only change when a piece of that side changed
+        affected = []
+        if touched_colours & (1 << Colour.WHITE):
+            affected += (Piece.wN, Piece.wK)
+        if touched_colours & (1 << Colour.BLACK):
+            affected += (Piece.bN, Piece.bK)
+        ## Pawns push onto the squares one or two ranks ahead of them
+        if ((bitboards[Piece.wP] << 8) | (bitboards[Piece.wP] << 16)) & touched_squares:
+            affected.append(Piece.wP)
+        if ((bitboards[Piece.bP] >> 8) | (bitboards[Piece.bP] >> 16)) & touched_squares:
+            affected.append(Piece.bP)
+        ## A slider sees a touched square exactly when a slider of the same
+        ## kind on the touched square would see the slider
+        rook_lines = 0
+        bishop_lines = 0
+        while touched_squares:
+            lsb = touched_squares & -touched_squares
+            square = lsb.bit_length() - 1
+            rook_lines |= magic_rook_attack(square, occupied)
+            bishop_lines |= magic_bishop_attack(square, occupied)
+            touched_squares ^= lsb
+        for piece in (Piece.wR, Piece.bR):
+            if rook_lines & bitboards[piece]:
+                affected.append(piece)
+        for piece in (Piece.wB, Piece.bB):
+            if bishop_lines & bitboards[piece]:
+                affected.append(piece)
+        for piece in (Piece.wQ, Piece.bQ):
+            if (rook_lines | bishop_lines) & bitboards[piece]:
+                affected.append(piece)
+        return affected
 
-        north = north_ray(bitboard, from_square)
-        intersection = occupied & north
-        if intersection:
-            first_block = forward_bitscan(intersection)
-            block_ray = north_ray(bitboard, first_block)
-            north ^= block_ray
-
-        south = south_ray(bitboard, from_square)
-        intersection = occupied & south
-        if intersection:
-            first_block = backward_bitscan(intersection)
-            block_ray = south_ray(bitboard, first_block)
-            south ^= block_ray
-
-        east = east_ray(bitboard, from_square)
-        intersection = occupied & east
-        if intersection:
-            first_block = forward_bitscan(intersection)
-            block_ray = north_ray(bitboard, first_block)
-            east ^= block_ray
-
-        west = west_ray(bitboard, from_square)
-        intersection = occupied & west
-        if intersection:
-            first_block = backward_bitscan(intersection)
-            block_ray = south_ray(bitboard, first_block)
-            west ^= block_ray
-
-        legal_moves = north | south | east | west
-
-        ## Remove own piece targets
-        own_piece_targets = self.occupied_squares_by_colour[colour_to_move]
-
-        if own_piece_targets:
-            legal_moves &= ~own_piece_targets
-
-        if colour_to_move == Colour.WHITE:
-            self.white_rook_attacks = legal_moves
-        if colour_to_move == Colour.BLACK:
-            self.black_rook_attacks = legal_moves
-        return legal_moves
-
-## ---------------------------- ##
-## Updating legal knight moves  ##
-## ---------------------------- ##
-    def update_legal_knight_moves(self, from_square: np.uint64, colour_to_move: int):
+    def update_attack_bitboards(self, change_map):
         """
-        Update the pseudo-legal knight moves. Note that a knight is not a sliding
-        piece so it can jump over any 'blocking' pieces.
+        Update all attack bitboards that have changed after the
+        move has been executed
         Parameters:
-            from_square: the proposed square from which the knight is moving
-            colour_to_move: current colour to move
+            change_map: dictionary of the bitboards of the pieces that changed
+            indexed by piece
+        """
+        ## Only the colours with a changed attack bitboard need their attacked
+        ## squares recomputed, a piece that is only revisited because one of
+        ## its squares was touched often ends up attacking the same squares
+        colours = 0
+        attack_updaters = self.attack_updaters
+        for piece, bitboard in change_map.items():
+            update, colour, arguments = attack_updaters[piece]
+            if update(bitboard, colour, *arguments):
+                colours |= 1 << colour
+
+        self.update_attacked_squares(colours)
+
+    def update_set_attacks(self, pieces: int, colour: int, attack_bitboard: str, set_attacks) -> bool:
+        """
+        Update the attacks of a set of leaping pieces, knights and kings do not
+        depend on blockers so the shifts of the set attacks cover all of them
+        in one go
+        Parameters:
+            pieces: bitboard of all pieces of the kind
+            colour: the colour of the pieces
+            attack_bitboard: name of the attack bitboard to write
+            set_attacks: function returning the attacks of a set of pieces
+        Returns:
+            whether the attack bitboard changed
         """
-        legal_knight_moves = self.board.get_knight_attack(from_square)
-        ## It can not capture friendly pieces so remove these
-        if colour_to_move == Colour.WHITE:
-            legal_knight_moves &= ~self.board.white_pieces
-            self.white_knight_attacks = legal_knight_moves
-        if colour_to_move == Colour.BLACK:
-            legal_knight_moves &= ~self.board.black_pieces
-            self.black_knight_attacks = legal_knight_moves
+        own_pieces = self.board.black_pieces if colour else self.board.white_pieces
+        attacks = set_attacks(pieces) & ~own_pieces
+        if attacks == getattr(self, attack_bitboard):
+            return False
+        setattr(self, attack_bitboard, attacks)
+        return True
 
-## ---------------------------- ##
-## Updating legal bishop moves  ##
-## ---------------------------- ##
-    def update_legal_bishop_moves(self, from_square: np.uint64, colour_to_move: int) -> np.uint64:
+    def update_slider_attacks(self, pieces: int, colour: int, attack_bitboard: str, slider_attack) -> bool:
         """
-        Update the pseudo-legal sliding-piece moves for diagonal directions
-        by getting the first blocker in each relevant direction using a bitscan.
+        Update the attacks of a set of sliding pieces, the lookups of all their
+        squares are gathered in a local and masked and stored once
         Parameters:
-            from_square: the proposed square from which the rook is moving
-            colour_to_move: current colour to move
-        """
-        bitboard = make_uint()
-        occupied = self.board.occupied_squares
-
-        northeast = northeast_ray(bitboard, from_square)
-        intersection = northeast & occupied
-        if intersection:
-            first_block = forward_bitscan(intersection)
-            block_ray = northeast_ray(bitboard, first_block)
-            northeast ^= block_ray
-
-        northwest = northwest_ray(bitboard, from_square)
-        intersection = northwest & occupied
-        if intersection:
-            first_block = forward_bitscan(intersection)
-            block_ray = northwest_ray(bitboard, first_block)
-            northwest ^= block_ray
-
-        southeast = southeast_ray(bitboard, from_square)
-        intersection = southeast & occupied
-        if intersection:
-            first_block = backward_bitscan(intersection)
-            block_ray = southeast_ray(bitboard, first_block)
-            southeast ^= block_ray
-
-        southwest = southwest_ray(bitboard, from_square)
-        intersection = southwest & occupied
-        if intersection:
-            first_block = backward_bitscan(intersection)
-            block_ray = southwest_ray(bitboard, first_block)
-            southwest ^= block_ray
-
-        legal_moves = northeast | northwest | southeast | southwest
-
-        ## Remove own piece targets
-        own_piece_targets = self.occupied_squares_by_colour[colour_to_move]
-        if own_piece_targets:
-            legal_moves &= ~own_piece_targets
-
-        if colour_to_move == Colour.WHITE:
-            self.white_bishop_attacks = legal_moves
-        if colour_to_move == Colour.BLACK:
-            self.black_bishop_attacks = legal_moves
-        return legal_moves
+            pieces: bitboard of all pieces of the kind
+            colour: the colour of the pieces
+            attack_bitboard: name of the attack bitboard to write
+            slider_attack: magic lookup of the attacks from a single square
+        Returns:
+            whether the attack bitboard changed
+        """
+        board = self.board
+        occupied = board.occupied_squares
+        attacks = 0
+        ## The least significant bit is popped in place, this loop runs for
+        ## every slider after every move and a generator costs a frame resume
+        ## per square
+        while pieces:
+            lsb = pieces & -pieces
+            attacks |= slider_attack(lsb.bit_length() - 1, occupied)
+            pieces ^= lsb
+        attacks &= ~(board.black_pieces if colour else board.white_pieces)
+        if attacks == getattr(self, attack_bitboard):
+            return False
+        setattr(self, attack_bitboard, attacks)
+        return True
 
 ## ---------------------------- ##
-## Updating legal queen moves   ##
+## Updating legal pawn moves    ##
 ## ---------------------------- ##
-    def update_legal_queen_moves(self, from_square: np.uint64, colour_to_move: int):
+    def update_pawn_set_moves(self, pawns: int, colour_to_move: int) -> bool:
         """
-        Update the pseudo-legal queen moves through a bitwise OR of the legal
-        bishop and legal rook moves.
+        Update the pawn pushes and pawn attacks of all pawns of a colour at
+        once, shifting the whole pawn bitboard instead of looking up every
+        pawn on its own
         Parameters:
-            from_square: the proposed square from which the rook is moving
-            colour_to_move: current colour to move
+            pawns: bitboard of all pawns of the colour
+            colour_to_move: the colour of the pawns
+        Returns:
+            whether the pawn attacks changed, the pushes are not part of the
+            attacked squares
         """
-        diagonal_moves = self.update_legal_bishop_moves(from_square, colour_to_move)
-        rankfile_moves = self.update_legal_rook_moves(from_square, colour_to_move)
-
-        legal_moves = diagonal_moves | rankfile_moves
-
+        empty = self.board.empty_squares
         if colour_to_move == Colour.WHITE:
-            self.white_queen_attacks = legal_moves
-        if colour_to_move == Colour.BLACK:
-            self.black_queen_attacks = legal_moves
+            self.white_pawn_moves = white_pawn_set_pushes(pawns, empty)
+            pawn_attacks = white_pawn_set_attacks(pawns)
+            if pawn_attacks == self.white_pawn_attacks:
+                return False
+            self.white_pawn_attacks = pawn_attacks
+        else:
+            self.black_pawn_moves = black_pawn_set_pushes(pawns, empty)
+            pawn_attacks = black_pawn_set_attacks(pawns)
+            if pawn_attacks == self.black_pawn_attacks:
+                return False
+            self.black_pawn_attacks = pawn_attacks
+        return True
 
-## ---------------------------- ##
-## Updating legal king moves    ##
-## ---------------------------- ##
-    def update_legal_king_moves(self, from_square: np.uint64, colour_to_move: int):
+    ## King castling helper functions
+    def castle_king_moves(self, colour_to_move: int) -> int:
         """
-        Update the pseudo-legal king moves: one step in each direction and in
-        special circumstances also castling.
+        Return the target squares of the king of the given colour for the
+        castling moves it can currently make
         Parameters:
-            from_square: the proposed square from which the rook is moving
             colour_to_move: current colour to move
+        Returns:
+            bitboard of the castling squares of the king
         """
-        king_moves = generate_king_attack_bitboard(from_square)
+        kingside, queenside = self.can_castle(colour_to_move)
+        castle_targets = CASTLE_KING_TARGETS[colour_to_move]
+        king_moves = 0
+        if kingside:
+            king_moves |= castle_targets[0]
+        if queenside:
+            king_moves |= castle_targets[1]
+        return king_moves
 
-        if colour_to_move == Colour.WHITE:
-            own_piece_targets = self.board.white_pieces
-        if colour_to_move == Colour.BLACK:
-            own_piece_targets = self.board.black_pieces
-        if own_piece_targets.any():
-            king_moves &= ~own_piece_targets
-
-        ## Handle the castling moves for the king
-        can_castle = self.can_castle(colour_to_move)
-
-    ## King castling helper functions
     def can_castle(self, colour_to_move: int) -> list:
         """
         Check wether or not the king of the given colour can castle and also if
@@ -1153,71 +915,27 @@ class Position():
         Returns:
             Tuple (bool, bool) giving the castling rights on (kingside, queenside)
         """
-        castle_rights = self.castle_rights[colour_to_move]
-        if not castle_rights[0] and not castle_rights[1]:
+        ## Kingside right in the first bit, queenside right in the second
+        castle_rights = self.castle_rights >> (2 * colour_to_move) & 3
+        if not castle_rights:
             return [0, 0]
 
         if colour_to_move == Colour.WHITE:
-            if castle_rights[0]:
-                kingside_block = (self.black_attacked_squares |
-                                 (self.board.white_pieces & ~self.board.white_king)) & \
-                                  CastleRoute.WhiteKingside
-                rookH1 = self.board.white_rook & set_bit(make_uint(), Square.H1)
-                kingside = not kingside_block.any() and rookH1.any()
-            elif not castle_rights[0]:
-                kingside = 0
-            if castle_rights[1]:
-                queenside_block = (self.black_attacked_squares |
-                                  (self.board.white_pieces & ~self.board.white_king)) & \
-                                   CastleRoute.WhiteQueenside
-                rookA1 = self.board.white_rook & set_bit(make_uint(), Square.A1)
-                queenside = not queenside_block.any() and rookA1.any()
-            elif not castle_rights[1]:
-                queenside = 0
-            return [kingside, queenside]
-
-        if colour_to_move == Colour.BLACK:
-            if castle_rights[0]:
-                kingside_block = (self.white_attacked_squares |
-                                 (self.board.black_pieces & ~self.board.black_king)) & \
-                                  CastleRoute.BlackKingside
-                rookH8 = self.board.black_rook & set_bit(make_uint(), Square.H8)
-                kingside = not kingside_block.any() & rookH8.any()
-            elif not castle_rights[0]:
-                kingside = 0
-            if castle_rights[1]:
-                queenside_block = (self.white_attacked_squares |
-                                  (self.board.black_pieces & ~self.board.black_king)) & \
-                                   CastleRoute.BlackQueenside
-                rookA8 = self.board.black_rook & set_bit(make_uint(), Square.A8)
-                queenside = not queenside_block.any() & rookA8.any()
-            elif not castle_rights[1]:
-                queenside = 0
-            return [kingside, queenside]
-
-    @staticmethod
-    def add_castling_moves(bitboard: np.uint64, can_castle: list, colour_to_move: int) -> np.uint64:
-        """
-        Add the castling squares to the bitboard
-        Parameters:
-            bitboard: bitboard to put the castling squares into
-            can_castle: whether or not we are allowed to castle on the given side
-            colour_to_move: the colour that is to move
-        Returns:
-            bitboard containing the squares to perform the castling moves
-        """
-        if colour_to_move == Colour.WHITE:
-            if can_castle[0]:
-                bitboard |= set_bit(bitboard, Square.G1)
-            if can_castle[1]:
-                bitboard |= set_bit(bitboard, Square.C1)
-        if colour_to_move == Colour.BLACK:
-            if can_castle[0]:
-                bitboard |= set_bit(bitboard, Square.G8)
-            if can_castle[1]:
-                bitboard |= set_bit(bitboard, Square.C8)
-
-        return bitboard
+            enemy_attacks = self.black_attacked_squares
+        else:
+            enemy_attacks = self.white_attacked_squares
+        occupied = self.board.occupied_squares
+        rooks = self.board.bb[CASTLE_ROOKS[colour_to_move]]
+
+        can_castle = [0, 0]
+        for side in (0, 1):
+            if castle_rights & (1 << side):
+                blocked = ((enemy_attacks & CASTLE_ROUTES[colour_to_move][side]) |
+                           (occupied & CASTLE_PATHS[colour_to_move][side]))
+                ## Plain int truthiness, no conversions of the bitboards needed
+                if not blocked and rooks & CASTLE_ROOK_SQUARES[colour_to_move][side]:
+                    can_castle[side] = 1
+        return can_castle
 
     def evaluate_king_check(self):
         """
@@ -1225,12 +943,12 @@ class Position():
         opposing king position to update king_in_check for the corresponding
         colour
         """
-        if self.black_attacked_squares & self.board.white_king:
+        if self.black_attacked_squares & self.board.bb[Piece.wK]:
             self.king_in_check[0] = 1
         else:
             self.king_in_check[0] = 0
 
-        if self.white_attacked_squares & self.board.black_king:
+        if self.white_attacked_squares & self.board.bb[Piece.bK]:
             self.king_in_check[1] = 1
         else:
             self.king_in_check[1] = 0